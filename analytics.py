@@ -0,0 +1,364 @@
+import json
+import os
+import shutil
+import threading
+import time
+import numpy as np
+
+# Structured game analytics.
+#
+# A Recorder listens to one Game and turns every finished round and every
+# played card into rows. Rows are buffered per column and appended to a
+# ColumnStore: a directory per table holding numbered segment directories,
+# one .npy file per column. Segments are written once and never changed, so
+# the aggregator can memory-map them and stream through any number of rows
+# while only holding one chunk per column in RAM.
+#
+# Tables (one row per ...):
+#   rounds  - player per finished round: final hand (0 if out), out, won, discards
+#   effects - played card: target seat, guess, whether the effect resolved and
+#             its outcome for the player (Guard hit 1/miss 0, Baron +1/0/-1,
+#             Prince 1 if the target discarded the Princess, Princess -1) plus
+#             the card value it exposed (Priest peek, Prince discard, Baron target)
+#
+# `round` ids are unique within a store, so effects can be joined to rounds.
+#
+# Rows become visible in batches: commit() writes the buffered segments and
+# then atomically replaces manifest.json, which lists how many segments of
+# each table are committed. Segments past those counts are leftovers of an
+# interrupted batch; readers ignore them and the next writer deletes them. The
+# manifest also names the games of the last batch, so a caller that writes its
+# own record after commit() (tournament.run_schedule) can tell which games
+# already have rows after a crash in between.
+
+SCHEMA = {
+    'rounds': (
+        ('round', 'i8'), ('players', 'u1'), ('seat', 'u1'), ('hand', 'u1'), ('out', 'u1'),
+        ('won', 'u1'), ('discards', 'u1'), ('discard_sum', 'u1'), ('deck_left', 'u1'),
+    ),
+    'effects': (
+        ('round', 'i8'), ('players', 'u1'), ('turn', 'u1'), ('seat', 'u1'), ('card', 'u1'),
+        ('target', 'i1'), ('guess', 'u1'), ('resolved', 'u1'), ('outcome', 'i1'),
+        ('value', 'u1'), ('deck_left', 'u1'),
+    ),
+}
+SEGMENT_ROWS = 1 << 18 # Rows per segment file; also bounds the writer's buffers
+MANIFEST = "manifest.json"
+LIVE_COMMIT_SECONDS = 60 # commit_every for a store fed by live lobbies, which have no natural batch end
+CHUNK_ROWS = 1 << 20
+
+
+def empty_columns():
+    return {table: {name: [] for name, _ in columns} for table, columns in SCHEMA.items()}
+
+
+class Recorder:
+    """Collects rows from a game's events. Rows stay local until take() or, with a store, each round end."""
+
+    def __init__(self, game, store=None):
+        self.game = game
+        self.store = store
+        self.columns = empty_columns()
+        self.round = -1 # Local round number, the store turns it into a global id
+        self.turn = 0
+        self.effect = None # Row index of the card whose effect is being resolved
+        game.listeners.append(self.on_event)
+
+    def detach(self):
+        if self.on_event in self.game.listeners:
+            self.game.listeners.remove(self.on_event)
+
+    def take(self):
+        """Rows of the rounds recorded so far as (round count, {table: {column: list}}). Call between rounds."""
+        batch = (self.round + 1, self.columns)
+        self.columns = empty_columns()
+        self.round = -1
+        return batch
+
+    def seat(self, player):
+        return self.game.players.index(player) if player in self.game.players else -1
+
+    # --- Event handling ---
+
+    def on_event(self, event, data):
+        handler = getattr(self, 'on_' + event, None)
+        if handler:
+            handler(**data)
+
+    def on_round_start(self):
+        self.round += 1
+        self.turn = 0
+        self.effect = None
+
+    def on_play(self, player, value, target, guess):
+        cols = self.columns['effects']
+        self.effect = len(cols['round'])
+        cols['round'].append(self.round)
+        cols['players'].append(len(self.game.players))
+        cols['turn'].append(self.turn)
+        cols['seat'].append(self.seat(player))
+        cols['card'].append(value)
+        cols['target'].append(self.seat(target) if target else -1)
+        cols['guess'].append(guess or 0)
+        # Handmaid, Countess and Princess always resolve; the rest wait for their event
+        cols['resolved'].append(1 if value in (4, 7, 8) else 0)
+        cols['outcome'].append(-1 if value == 8 else 0)
+        cols['value'].append(0)
+        cols['deck_left'].append(len(self.game.deck))
+        self.turn += 1
+
+    def resolve(self, target, outcome=0, value=0):
+        if self.effect is None:
+            return
+        cols = self.columns['effects']
+        cols['target'][self.effect] = self.seat(target)
+        cols['resolved'][self.effect] = 1
+        cols['outcome'][self.effect] = outcome
+        cols['value'][self.effect] = value
+
+    def on_guard(self, player, target, guess, hit):
+        self.resolve(target, 1 if hit else 0)
+
+    def on_peek(self, player, target, value):
+        self.resolve(target, 0, value)
+
+    def on_baron(self, player, target, loser, values):
+        self.resolve(target, 0 if loser is None else -1 if loser is player else 1, values[1])
+
+    def on_prince(self, player, target, value):
+        self.resolve(target, 1 if value == 8 else 0, value)
+
+    def on_swap(self, player, target):
+        self.resolve(target)
+
+    def on_round_end(self, winners):
+        self.effect = None
+        cols = self.columns['rounds']
+        for seat, p in enumerate(self.game.players):
+            cols['round'].append(self.round)
+            cols['players'].append(len(self.game.players))
+            cols['seat'].append(seat)
+            cols['hand'].append(p.hand[0].value if p.hand and not p.is_out else 0)
+            cols['out'].append(1 if p.is_out else 0)
+            cols['won'].append(1 if p in winners else 0)
+            cols['discards'].append(len(p.discarded))
+            cols['discard_sum'].append(sum(c.value for c in p.discarded))
+            cols['deck_left'].append(len(self.game.deck))
+        if self.store is not None:
+            self.store.extend(*self.take())
+
+
+# --- Storage ---
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def all_segment_dirs(root, table):
+    path = os.path.join(root, table)
+    if not os.path.isdir(path):
+        return []
+    # Unfinished segments are hidden (".tmp-...") until they are renamed into place
+    return [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.isdigit()]
+
+
+def segment_dirs(root, table, manifest=None):
+    """Committed segments of a table, oldest first."""
+    manifest = manifest or load_manifest(root)
+    segments = all_segment_dirs(root, table)
+    if manifest is None:
+        return segments # Store written before manifests existed
+    return segments[:manifest['segments'][table]]
+
+
+def load_segment(path, columns):
+    return {name: np.load(os.path.join(path, name + ".npy"), mmap_mode='r') for name in columns}
+
+
+class ColumnStore:
+    """Append-only writer. One writer per directory; any number of readers.
+
+    Thread safe, so one store can take the rounds of every lobby in a process.
+    With `commit_every` (seconds), extend() also commits once that long has
+    passed since the last commit; otherwise rows are committed by commit().
+    """
+
+    def __init__(self, root, segment_rows=SEGMENT_ROWS, commit_every=None, clock=time.monotonic):
+        self.root = root
+        self.segment_rows = segment_rows
+        self.commit_every = commit_every
+        self.clock = clock
+        self.last_commit = clock()
+        self.buffers = empty_columns()
+        self.lock = threading.RLock() # commit() flushes, extend() may commit
+        manifest = load_manifest(root)
+        self.games = manifest['games'] if manifest else [] # Games of the last commit
+        self.segments = {} # table -> segments written, committed or not
+        self.next_round = manifest['next_round'] if manifest else 0
+        for table in SCHEMA:
+            path = os.path.join(root, table)
+            os.makedirs(path, exist_ok=True)
+            committed = segment_dirs(root, table, manifest)
+            keep = {os.path.basename(segment) for segment in committed}
+            for name in os.listdir(path):
+                if name not in keep: # Left behind by an interrupted batch
+                    shutil.rmtree(os.path.join(path, name))
+            self.segments[table] = len(committed)
+            if committed and manifest is None:
+                # Round ids only grow, so the last row of the last segment is the largest
+                rounds = load_segment(committed[-1], ['round'])['round']
+                if len(rounds):
+                    self.next_round = max(self.next_round, int(rounds[-1]) + 1)
+        if manifest is None:
+            self.commit() # From now on readers only see committed segments
+
+    def extend(self, rounds, columns):
+        """Append a Recorder batch, renumbering its rounds to ids unique in this store."""
+        with self.lock:
+            for table, cols in columns.items():
+                buf = self.buffers[table]
+                for name, values in cols.items():
+                    if name == 'round':
+                        values = [r + self.next_round for r in values]
+                    buf[name].extend(values)
+                if len(buf['round']) >= self.segment_rows:
+                    self.flush(table, partial=False) # Not visible before the next commit
+            self.next_round += rounds
+            if self.commit_every is not None and self.clock() - self.last_commit >= self.commit_every:
+                self.commit()
+
+    def flush(self, table=None, partial=True):
+        """Write buffered rows as segments; with partial=False only full segments are written.
+
+        Written segments stay invisible to readers until commit().
+        """
+        with self.lock:
+            for table in [table] if table else list(SCHEMA):
+                buf = self.buffers[table]
+                while len(buf['round']) >= (1 if partial else self.segment_rows):
+                    size = min(len(buf['round']), self.segment_rows)
+                    self.write_segment(table, {name: values[:size] for name, values in buf.items()})
+                    for values in buf.values():
+                        del values[:size]
+
+    def commit(self, games=()):
+        """Make every row added so far visible at once, recording `games` as the batch they came from."""
+        with self.lock:
+            self.flush()
+            manifest = {'segments': self.segments, 'next_round': self.next_round, 'games': list(games)}
+            tmp = os.path.join(self.root, f".tmp-{MANIFEST}")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, os.path.join(self.root, MANIFEST))
+            self.games = list(games)
+            self.last_commit = self.clock()
+
+    def write_segment(self, table, cols):
+        path = os.path.join(self.root, table)
+        number = self.segments[table]
+        tmp = os.path.join(path, f".tmp-{number:08d}")
+        os.makedirs(tmp, exist_ok=True)
+        for name, dtype in SCHEMA[table]:
+            np.save(os.path.join(tmp, name + ".npy"), np.asarray(cols[name], dtype=dtype))
+        os.rename(tmp, os.path.join(path, f"{number:08d}"))
+        self.segments[table] += 1
+
+    def close(self):
+        self.commit(self.games)
+
+
+# --- Aggregation ---
+
+def scan(root, table, columns, chunk_rows=CHUNK_ROWS):
+    """Yield {column: array} chunks of at most chunk_rows rows, segment by segment."""
+    for path in segment_dirs(root, table):
+        arrays = load_segment(path, columns)
+        rows = len(arrays[columns[0]])
+        for start in range(0, rows, chunk_rows):
+            yield {name: a[start:start + chunk_rows] for name, a in arrays.items()}
+
+
+def group_stats(root, table, by, value=None, where=None, chunk_rows=CHUNK_ROWS):
+    """{group values: (rows, sum of value)} grouped by the `by` columns.
+
+    `where` maps columns to a required value or a tuple of allowed values.
+    Group columns should be the small integer columns; `value` may be any column.
+    """
+    where = where or {}
+    columns = list(dict.fromkeys(list(by) + list(where) + ([value] if value else []))) or ['round']
+    totals = {}
+    for chunk in scan(root, table, columns, chunk_rows):
+        mask = None
+        for name, wanted in where.items():
+            m = np.isin(chunk[name], wanted) if isinstance(wanted, (tuple, list)) else chunk[name] == wanted
+            mask = m if mask is None else mask & m
+        groups = [chunk[name] if mask is None else chunk[name][mask] for name in by]
+        weights = None
+        if value:
+            weights = chunk[value] if mask is None else chunk[value][mask]
+            weights = weights.astype(np.float64)
+        rows = len(chunk[columns[0]]) if mask is None else int(mask.sum())
+        if not rows:
+            continue
+        # Mixed-radix key over the value ranges seen in this chunk, dense enough for bincount
+        key = np.zeros(rows, dtype=np.int64)
+        lows, spans = [], []
+        for g in groups:
+            low = int(g.min())
+            span = int(g.max()) - low + 1
+            key = key * span + (g.astype(np.int64) - low)
+            lows.append(low)
+            spans.append(span)
+        size = int(np.prod(spans)) if spans else 1
+        if size <= 1 << 20:
+            counts = np.bincount(key, minlength=size)
+            sums = np.bincount(key, weights=weights, minlength=size) if value else counts
+            present = np.flatnonzero(counts)
+            counts, sums = counts[present], sums[present]
+        else:
+            present, inverse = np.unique(key, return_inverse=True)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=weights) if value else counts
+        for k, c, s in zip(present.tolist(), counts.tolist(), sums.tolist()):
+            group = []
+            for low, span in zip(reversed(lows), reversed(spans)):
+                group.append(low + k % span)
+                k //= span
+            group = tuple(reversed(group))
+            old = totals.get(group, (0, 0))
+            totals[group] = (old[0] + c, old[1] + s)
+    return dict(sorted(totals.items()))
+
+
+def rate_table(stats):
+    return {group: (rows, total / rows) for group, (rows, total) in stats.items() if rows}
+
+
+def win_rate_by_hand(root):
+    """Win rate of players still in at round end, by the card they held."""
+    return rate_table(group_stats(root, 'rounds', ('hand',), 'won', where={'out': 0}))
+
+
+def guard_hit_rate_by_guess(root):
+    return rate_table(group_stats(root, 'effects', ('guess',), 'outcome', where={'card': 1, 'resolved': 1}))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Statystyki rozegranych rund z magazynu kolumnowego.")
+    parser.add_argument("root")
+    args = parser.parse_args()
+
+    print("Wygrane wg karty na koniec rundy:")
+    for (hand,), (rows, rate) in win_rate_by_hand(args.root).items():
+        print(f"  {hand}: {rate:6.1%}  ({rows} rąk)")
+    print("Trafienia Strażniczki wg typowanej karty:")
+    for (guess,), (rows, rate) in guard_hit_rate_by_guess(args.root).items():
+        print(f"  {guess}: {rate:6.1%}  ({rows} zagrań)")
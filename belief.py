@@ -0,0 +1,194 @@
+import weakref
+from game_logic import CARD_COUNTS
+
+# What one player can infer about the others from public information
+# (discard piles, deck size) plus what only they saw (Priest peeks, King swaps,
+# Baron ties). Updated from Game events, so queries never rescan the game.
+
+VALUES = range(1, 9)
+
+
+class OpponentInfo:
+    __slots__ = ('known', 'excluded', 'min_value')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.known = None # Exact hand value, if we have seen it
+        self.excluded = set() # Values ruled out by missed Guard guesses
+        self.min_value = 1 # Hand beat a Baron comparison against this value - 1
+
+    def copy_from(self, other):
+        self.known = other.known
+        self.excluded = set(other.excluded)
+        self.min_value = other.min_value
+
+
+class BeliefTracker:
+    def __init__(self, game, sid):
+        self.game = game
+        self.sid = sid
+        self.public = dict.fromkeys(VALUES, 0) # Cards on all discard piles
+        self.info = {}
+        self.reset()
+        self.listener = self.weak_listener()
+        game.listeners.append(self.listener)
+
+    def weak_listener(self):
+        # The game only holds a weak reference: a tracker its owner dropped without
+        # detach() (a closed browser tab) unregisters itself on the next event
+        ref = weakref.ref(self)
+        listeners = self.game.listeners
+
+        def listener(event, data):
+            tracker = ref()
+            if tracker is None:
+                listeners.remove(listener)
+            else:
+                tracker.on_event(event, data)
+        return listener
+
+    def detach(self):
+        if self.listener in self.game.listeners:
+            self.game.listeners.remove(self.listener)
+
+    def reset(self):
+        # Also used when attaching mid-round: rebuild from what is public right now
+        self.public = dict.fromkeys(VALUES, 0)
+        for p in self.game.players:
+            for c in p.discarded:
+                self.public[c.value] += 1
+        self.info = {p.sid: OpponentInfo() for p in self.game.players if p.sid != self.sid}
+
+    def opponent(self, player):
+        info = self.info.get(player.sid)
+        if info is None and player.sid != self.sid:
+            info = self.info[player.sid] = OpponentInfo()
+        return info
+
+    # --- Event handling ---
+
+    def on_event(self, event, data):
+        handler = getattr(self, 'on_' + event, None)
+        if handler:
+            handler(**data)
+
+    def on_round_start(self):
+        self.reset()
+
+    def on_discard(self, player, values):
+        for v in values:
+            self.public[v] += 1
+        info = self.opponent(player)
+        if info is not None and player.is_out:
+            info.clear() # Their hand is on the discard pile now
+
+    def on_play(self, player, value, target, guess):
+        info = self.opponent(player)
+        if info is None:
+            return
+        # Playing anything but the known card leaves the known card in hand
+        kept_known = info.known is not None and value != info.known
+        known = info.known
+        info.clear()
+        if kept_known:
+            info.known = known
+
+    def on_guard(self, player, target, guess, hit):
+        info = self.opponent(target)
+        if info is not None and not hit:
+            info.excluded.add(guess)
+
+    def on_peek(self, player, target, value):
+        if player.sid == self.sid:
+            self.opponent(target).known = value
+
+    def on_baron(self, player, target, loser, values):
+        if loser is None:
+            if player.sid == self.sid:
+                self.opponent(target).known = values[0]
+            elif target.sid == self.sid:
+                self.opponent(player).known = values[1]
+            return
+        winner = player if loser is target else target
+        info = self.opponent(winner)
+        if info is not None:
+            loser_value = values[1] if loser is target else values[0]
+            info.min_value = max(info.min_value, loser_value + 1)
+
+    def on_prince(self, player, target, value):
+        info = self.opponent(target)
+        if info is not None:
+            info.clear()
+
+    def on_swap(self, player, target):
+        if self.sid in (player.sid, target.sid):
+            # We know the card we just handed over
+            other = target if player.sid == self.sid else player
+            info = self.opponent(other)
+            info.clear()
+            info.known = other.hand[0].value if other.hand else None
+            return
+        a, b = self.opponent(player), self.opponent(target)
+        tmp = OpponentInfo()
+        tmp.copy_from(a)
+        a.copy_from(b)
+        b.copy_from(tmp)
+
+    # --- Queries ---
+
+    def unseen_counts(self):
+        """Cards not visible to us: deck, removed card and opponents' hands."""
+        me = self.game.get_player_by_sid(self.sid)
+        counts = [0] * 9
+        for v in VALUES:
+            counts[v] = CARD_COUNTS[v] - self.public[v]
+        if me:
+            for c in me.hand:
+                counts[c.value] -= 1
+        return counts
+
+    def posterior(self, sid, unseen=None):
+        """Probability of each hand value (index 1-8) for opponent `sid`."""
+        probs = [0.0] * 9
+        info = self.info.get(sid)
+        if info is None:
+            return probs
+        if info.known is not None:
+            probs[info.known] = 1.0
+            return probs
+        weights = list(unseen or self.unseen_counts())
+        for other_sid, other in self.info.items():
+            if other_sid != sid and other.known is not None and weights[other.known] > 0:
+                weights[other.known] -= 1
+        total = 0
+        for v in VALUES:
+            if v < info.min_value or v in info.excluded or weights[v] < 0:
+                weights[v] = 0
+            total += weights[v]
+        if total:
+            for v in VALUES:
+                probs[v] = weights[v] / total
+        return probs
+
+    def targets(self):
+        return [p for p in self.game.players if p.sid != self.sid and not p.is_out and not p.is_protected]
+
+    def best_guard_guess(self):
+        """(target_sid, guess_value, probability) of the most likely Guard hit, or None."""
+        unseen = self.unseen_counts()
+        best = None
+        for p in self.targets():
+            probs = self.posterior(p.sid, unseen)
+            for v in range(2, 9):
+                if best is None or probs[v] > best[2]:
+                    best = (p.sid, v, probs[v])
+        return best
+
+    def baron_odds(self, target_sid, my_value):
+        """(win, tie, lose) probabilities of a Baron comparison with `my_value` kept."""
+        probs = self.posterior(target_sid)
+        win = sum(probs[1:my_value])
+        tie = probs[my_value]
+        return win, tie, max(0.0, 1.0 - win - tie)
@@ -0,0 +1,117 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+# Startup benchmark for the Streamlit app.
+#
+#   cold import  - fresh interpreter importing the UI modules
+#   first paint  - first run of streamlit_app.py for a new session (login screen)
+#   rerun        - every later run of the script for that session
+#   lobby rerun  - a run for a session waiting in a lobby
+#   game rerun   - a run for a session seated in a started game, hints off
+#
+# Runs use streamlit's AppTest, so no server or browser is needed. The lobby
+# and game screens end with a 2 s sleep before their auto-refresh; here the
+# sleep raises instead, so a run stops once the screen is drawn. Exits with
+# status 1 when a median is over its budget.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "streamlit_app.py")
+
+BUDGET_MS = {'cold import': 1500.0, 'first paint': 400.0, 'rerun': 15.0, 'lobby rerun': 15.0, 'game rerun': 25.0}
+
+
+class Refresh(Exception):
+    pass
+
+
+def stop_at_refresh(seconds):
+    raise Refresh()
+
+
+def cold_import(module, repeat):
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.split()[-1]) * 1000)
+    return times
+
+
+def app_runs(sessions, reruns):
+    from streamlit.testing.v1 import AppTest
+    first, again = [], []
+    for _ in range(sessions):
+        app = AppTest.from_file(APP)
+        started = time.perf_counter()
+        app.run()
+        first.append((time.perf_counter() - started) * 1000)
+        if app.exception:
+            raise RuntimeError(f"streamlit_app.py failed: {app.exception}")
+        for _ in range(reruns):
+            started = time.perf_counter()
+            app.run()
+            again.append((time.perf_counter() - started) * 1000)
+    return first, again
+
+
+def seated_runs(sessions, reruns, started):
+    """Reruns of one player's session in a two-player lobby, started or not."""
+    from streamlit import logger
+    from streamlit.testing.v1 import AppTest
+    import ui
+    from game_logic import Player
+    logger.set_log_level("critical") # Streamlit logs the traceback of every stopped run
+    manager = ui.get_manager()
+    times = []
+    with mock.patch.object(ui, 'time', SimpleNamespace(sleep=stop_at_refresh)):
+        for _ in range(sessions):
+            lobby_id = manager.create_lobby()
+            game = manager.get_game(lobby_id)
+            game.add_player(Player("Ala", "bench-a"))
+            game.add_player(Player("Bob", "bench-b"))
+            if started:
+                game.start_game()
+            app = AppTest.from_file(APP)
+            app.session_state['session_id'] = "bench-a"
+            app.session_state['nickname'] = "Ala"
+            app.session_state['lobby_id'] = lobby_id
+            for run in range(reruns + 1):
+                started_at = time.perf_counter()
+                app.run()
+                if run:
+                    times.append((time.perf_counter() - started_at) * 1000)
+                if not (len(app.exception) == 1 and 'Refresh' in app.exception[0].stack_trace[-1]):
+                    raise RuntimeError(f"streamlit_app.py failed: {app.exception}")
+            manager.remove_lobby(lobby_id)
+    return times
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pomiar czasu startu aplikacji Streamlit.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters for the cold import.")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns per session.")
+    args = parser.parse_args()
+
+    results = {
+        'cold import': cold_import("ui", args.repeat),
+    }
+    results['first paint'], results['rerun'] = app_runs(args.sessions, args.reruns)
+    results['lobby rerun'] = seated_runs(args.sessions, args.reruns, started=False)
+    results['game rerun'] = seated_runs(args.sessions, args.reruns, started=True)
+
+    over = False
+    for name, times in results.items():
+        median = statistics.median(times)
+        budget = BUDGET_MS[name]
+        over |= median > budget
+        status = "OK" if median <= budget else "PONAD BUDŻET"
+        print(f"{name:12} mediana {median:8.2f} ms  max {max(times):8.2f} ms  budżet {budget:7.1f} ms  {status}")
+    sys.exit(1 if over else 0)
@@ -0,0 +1,125 @@
+import os
+from belief import BeliefTracker
+from endgame import MAX_DECK, analyze
+from game_logic import CARD_COUNTS
+from opening_book import DEFAULT_PATH, OpeningBook
+
+# Bots drive a seat of a live Game through the same moves the UI offers.
+# One instance per seat per game: bots may keep state between turns.
+
+
+class RandomBot:
+    name = "random"
+
+    def __init__(self, game, sid, rng):
+        self.game = game
+        self.sid = sid
+        self.rng = rng
+
+    @property
+    def me(self):
+        return self.game.get_player_by_sid(self.sid)
+
+    def choose_move(self):
+        return self.rng.choice(self.game.legal_moves(self.me))
+
+
+class CautiousBot(RandomBot):
+    """Plays the lower card, guesses the most common unseen card, never discards the Princess voluntarily."""
+    name = "cautious"
+
+    def unseen_counts(self):
+        counts = dict(CARD_COUNTS)
+        for p in self.game.players:
+            for c in p.discarded:
+                counts[c.value] -= 1
+        for c in self.me.hand:
+            counts[c.value] -= 1
+        return counts
+
+    def score_move(self, move, unseen):
+        card_index, target_sid, guess = move
+        hand = self.me.hand
+        value = hand[card_index].value
+        kept = hand[1 - card_index].value if len(hand) > 1 else 0
+        score = -value
+        if value == 8:
+            score -= 100
+        elif value == 1 and guess:
+            score += unseen[guess]
+        elif value == 3:
+            score += 5 if kept >= 5 else -5
+        elif value == 5 and target_sid == self.sid:
+            score -= 3 if kept >= 4 else -1
+        elif value == 6:
+            score -= kept / 2
+        return score
+
+    def choose_move(self):
+        moves = self.game.legal_moves(self.me)
+        unseen = self.unseen_counts()
+        scored = [(self.score_move(m, unseen), m) for m in moves]
+        best = max(s for s, _ in scored)
+        return self.rng.choice([m for s, m in scored if s == best])
+
+
+class TrackerBot(CautiousBot):
+    """CautiousBot that scores Guard and Baron plays with a BeliefTracker posterior."""
+    name = "tracker"
+
+    def __init__(self, game, sid, rng):
+        super().__init__(game, sid, rng)
+        self.tracker = BeliefTracker(game, sid)
+
+    def score_move(self, move, unseen):
+        card_index, target_sid, guess = move
+        hand = self.me.hand
+        value = hand[card_index].value
+        if value == 1 and guess:
+            return -1 + 5 * self.tracker.posterior(target_sid)[guess]
+        if value == 3 and target_sid:
+            win, tie, lose = self.tracker.baron_odds(target_sid, hand[1 - card_index].value)
+            return -3 + 8 * (win - lose)
+        return super().score_move(move, unseen)
+
+
+class EndgameBot(TrackerBot):
+    """TrackerBot that switches to the endgame search once the deck is small enough."""
+    name = "endgame"
+
+    def choose_move(self):
+        if len(self.game.deck) <= MAX_DECK.get(len(self.game.players), -1):
+            return analyze(self.game, self.sid, self.tracker)['best']
+        return super().choose_move()
+
+
+class BookBot(EndgameBot):
+    """Plays from the precomputed opening book when the position is in it, searches otherwise."""
+    name = "book"
+    book = None # Shared by all instances in the process, False if there is no book file
+
+    @classmethod
+    def load_book(cls):
+        if cls.book is None:
+            cls.book = OpeningBook() if os.path.exists(DEFAULT_PATH) else False
+        return cls.book
+
+    def choose_move(self):
+        book = self.load_book()
+        entry = book.lookup(self.game, self.me) if book else None
+        if entry:
+            card, arg = entry
+            hand = self.me.hand
+            moves = [m for m in self.game.legal_moves(self.me) if hand[m[0]].value == card]
+            if card == 1:
+                moves = [m for m in moves if m[2] in (arg, None)]
+            elif card == 5:
+                moves = [m for m in moves if (m[1] == self.sid) == (arg == 1)]
+            if moves:
+                # The book has no targets in it: pick the target the tracker likes best
+                unseen = self.unseen_counts()
+                return max(moves, key=lambda m: self.score_move(m, unseen))
+        return super().choose_move()
+
+
+BOTS = {bot.name: bot for bot in (RandomBot, CautiousBot, TrackerBot, EndgameBot, BookBot)}
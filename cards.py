@@ -0,0 +1,73 @@
+from enum import IntEnum
+
+# Card definitions, shared by the engine and the UI without pulling in game state.
+
+class CardValue(IntEnum):
+    STRAZNICZKA = 1
+    KAPLAN = 2
+    BARON = 3
+    POKOJOWKA = 4
+    KSIAZE = 5
+    KROL = 6
+    HRABINA = 7
+    KSIEZNICZKA = 8
+
+# 5x1, 2x2, 2x3, 2x4, 2x5, 1x6, 1x7, 1x8
+CARD_COUNTS = {1: 5, 2: 2, 3: 2, 4: 2, 5: 2, 6: 1, 7: 1, 8: 1}
+
+CARD_NAMES = {
+    1: "Strażniczka",
+    2: "Kapłan",
+    3: "Baron",
+    4: "Pokojówka",
+    5: "Książę",
+    6: "Król",
+    7: "Hrabina",
+    8: "Księżniczka"
+}
+
+CARD_DESCRIPTIONS = {
+    1: "Zgadnij kartę innego gracza (nie Strażniczka).",
+    2: "Podglądnij rękę innego gracza.",
+    3: "Porównaj ręce z innym graczem; niższa odpada.",
+    4: "Ignoruj wszystkie efekty do twojej następnej tury.",
+    5: "Wybierz gracza, aby odrzucił rękę.",
+    6: "Wymień się ręką z innym graczem.",
+    7: "Musi być odrzucona jeśli masz Króla lub Księcia.",
+    8: "Jeśli odrzucisz tę kartę, odpadasz."
+}
+
+class Card:
+    # Cards never change, so Card(value) always returns one shared instance per value
+    __slots__ = ('value',)
+    _instances = {}
+
+    def __new__(cls, value):
+        card = cls._instances.get(value)
+        if card is None:
+            card = super().__new__(cls)
+            card.value = value
+            cls._instances[value] = card
+        return card
+
+    def __reduce__(self):
+        return (Card, (self.value,))
+
+    @property
+    def name(self):
+        return self.get_name(self.value)
+
+    @property
+    def description(self):
+        return self.get_description(self.value)
+
+    @staticmethod
+    def get_name(value):
+        return CARD_NAMES.get(value, "Nieznana")
+
+    @staticmethod
+    def get_description(value):
+        return CARD_DESCRIPTIONS.get(value, "")
+    
+    def __repr__(self):
+        return f"{self.name} ({self.value})"
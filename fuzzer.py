@@ -0,0 +1,233 @@
+import os
+import random
+import re
+import sys
+import time
+from multiprocessing import Pool
+from game_logic import CARD_COUNTS, Game, Player
+
+# Randomized rules fuzzer. Each seed expands into a random command sequence:
+# joins and leaves at any time, starts, round restarts and card plays that
+# are either legal or arbitrary (wrong player, bad index, odd targets and
+# guesses). Invariants are checked after every command; a failing sequence is
+# shrunk to a minimal one that still fails. Commands refer to seats and move
+# numbers rather than concrete cards, so removing a command keeps the rest
+# meaningful.
+#
+# Speed is a per-core figure: about 1.1-2.5k games/s per core at the default
+# 80 commands, depending on the machine. The pool adds one core's worth per
+# worker, so tens of thousands of games per second need a machine with 10+
+# cores. When using the fuzzer to gate an engine refactor, compare the per-core
+# rate it prints before and after on the same machine, not the total.
+
+DEFAULT_LENGTH = 80
+TOTAL_CARDS = sum(CARD_COUNTS.values())
+# A card multiset as one int, 4 bits of count per value; no value has 16 copies
+CARD_BITS = {v: 1 << 4 * v for v in CARD_COUNTS}
+ALL_CARDS = sum(CARD_BITS[v] * count for v, count in CARD_COUNTS.items())
+
+
+GUESSES = [None, 0] + list(range(1, 9))
+
+
+def random_commands(rng, length):
+    commands = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.08:
+            commands.append(('join', rng.randrange(6)))
+        elif r < 0.12:
+            commands.append(('leave', rng.randrange(6)))
+        elif r < 0.14:
+            commands.append(('start',))
+        elif r < 0.24:
+            # Anything the client could send, from any seat
+            target = rng.randrange(7)
+            commands.append(('play', rng.randrange(6), rng.randrange(-1, 3),
+                             target if target < 6 else None, GUESSES[rng.randrange(len(GUESSES))]))
+        else:
+            commands.append(('move', rng.getrandbits(16)))
+    return commands
+
+
+class InvariantError(Exception):
+    pass
+
+
+class Harness:
+    def __init__(self, seed):
+        self.game = Game("FUZZ", rng=random.Random(seed))
+        self.game.listeners.append(self.on_event)
+        self.dealt = False
+        self.gone = 0 # Cards held by players who left since the last deal, see CARD_BITS
+        self.scores = {}
+
+    def on_event(self, event, data):
+        if event == 'round_start':
+            self.dealt = True
+            self.gone = 0
+
+    def seat(self, n):
+        players = self.game.players
+        return players[n % len(players)] if players else None
+
+    def run(self, command):
+        """Apply one command; False if it never reached the game."""
+        game = self.game
+        kind = command[0]
+        if kind == 'join':
+            game.add_player(Player(f"p{command[1]}", f"p{command[1]}"))
+        elif kind == 'leave':
+            player = self.seat(command[1])
+            if not player:
+                return False
+            if self.dealt:
+                self.gone += sum(CARD_BITS[c.value] for c in player.hand + player.discarded)
+            game.remove_player(player.sid)
+            self.scores.pop(player.sid, None)
+        elif kind == 'start':
+            game.start_game()
+        elif kind == 'play':
+            _, seat, card_index, target, guess = command
+            player = self.seat(seat)
+            if not player:
+                return False
+            target_sid = self.seat(target).sid if target is not None else None
+            game.play_card(player.sid, card_index, target_sid, guess)
+        elif kind == 'move':
+            # Whatever keeps the game going: start it, restart a finished round
+            # (try_auto_restart without the wait) or play a legal move
+            if not game.game_started:
+                return game.start_game()
+            if game.game_over:
+                if len(game.players) < 2:
+                    return False
+                game.start_round()
+                return True
+            player = game.players[game.turn_index]
+            moves = game.legal_moves(player)
+            success, msg = game.play_card(player.sid, *moves[command[1] % len(moves)])
+            if not success:
+                raise InvariantError(f"legal move rejected: {msg}")
+        return True
+
+    def check(self):
+        game = self.game
+        for p in game.players:
+            if p.score < self.scores.get(p.sid, 0):
+                raise InvariantError(f"score of {p.sid} went down")
+            self.scores[p.sid] = p.score
+
+        if not self.dealt:
+            return
+        cards = self.gone
+        for c in game.deck:
+            cards += CARD_BITS[c.value]
+        if game.removed_card:
+            cards += CARD_BITS[game.removed_card.value]
+        for p in game.players:
+            for c in p.hand:
+                cards += CARD_BITS[c.value]
+            for c in p.discarded:
+                cards += CARD_BITS[c.value]
+        if cards != ALL_CARDS:
+            counts = {v: cards >> 4 * v & 15 for v in CARD_COUNTS}
+            raise InvariantError(f"cards not conserved: {sum(counts.values())} of {TOTAL_CARDS}, {counts}")
+
+        if game.game_over or not game.players:
+            return
+        if not 0 <= game.turn_index < len(game.players):
+            raise InvariantError(f"turn index {game.turn_index} out of range")
+        current = game.players[game.turn_index]
+        if current.is_out:
+            raise InvariantError(f"turn holder {current.sid} is out")
+        for p in game.players:
+            expected = 0 if p.is_out else 2 if p is current else 1
+            if len(p.hand) != expected:
+                raise InvariantError(f"{p.sid} holds {len(p.hand)} cards, expected {expected}")
+
+
+def run_commands(seed, commands):
+    """(step, error) of the first failure, or None if every invariant held."""
+    harness = Harness(seed)
+    for step, command in enumerate(commands):
+        try:
+            if harness.run(command):
+                harness.check()
+        except Exception as e:
+            return step, f"{type(e).__name__}: {e}"
+    return None
+
+
+def commands_for(seed, length):
+    return random_commands(random.Random(f"fuzz:{seed}"), length)
+
+
+def signature(error):
+    # The whole message with seats and numbers masked: "p2 holds 3 cards, expected 1"
+    # and "p0 holds 0 cards, expected 1" are the same bug, "turn holder p1 is out" is not
+    return re.sub(r'\d+', '#', error)
+
+
+def shrink(seed, commands):
+    """Smallest command list failing the same way, found by removing chunks (ddmin style)."""
+    failure = run_commands(seed, commands)
+    kind = signature(failure[1]) # So shrinking does not drift to another bug
+    commands = commands[:failure[0] + 1]
+    chunk = len(commands) // 2
+    while chunk >= 1:
+        i = 0
+        while i < len(commands):
+            candidate = commands[:i] + commands[i + chunk:]
+            result = run_commands(seed, candidate) if candidate else None
+            if result and signature(result[1]) == kind:
+                commands = candidate[:result[0] + 1]
+            else:
+                i += chunk
+        chunk //= 2
+    return commands
+
+
+def fuzz_batch(job):
+    """Run `count` seeds from `first`. Runs in a worker process."""
+    first, count, length = job
+    failures = []
+    for seed in range(first, first + count):
+        result = run_commands(seed, commands_for(seed, length))
+        if result:
+            failures.append((seed, result))
+    return count, failures
+
+
+def fuzz(games, length=DEFAULT_LENGTH, seed=0, workers=None, batch=500):
+    jobs = [(first, min(batch, seed + games - first), length) for first in range(seed, seed + games, batch)]
+    failures = []
+    with Pool(workers) as pool:
+        for _, batch_failures in pool.imap_unordered(fuzz_batch, jobs):
+            failures += batch_failures
+    return sorted(failures)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Losowe testowanie reguł gry z kontrolą niezmienników.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--length", type=int, default=DEFAULT_LENGTH, help="Commands per game.")
+    parser.add_argument("--seed", type=int, default=0, help="First seed.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--show", type=int, default=3, help="Failures to shrink and print.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    failures = fuzz(args.games, args.length, args.seed, args.workers)
+    elapsed = time.perf_counter() - started
+    workers = args.workers or os.cpu_count()
+    print(f"{args.games} gier w {elapsed:.1f} s ({args.games / elapsed:.0f}/s, "
+          f"{args.games / elapsed / workers:.0f}/s na proces, {workers} proc.), błędów: {len(failures)}")
+    for seed, (step, error) in failures[:args.show]:
+        commands = shrink(seed, commands_for(seed, args.length))
+        print(f"\nseed {seed}: {error}")
+        for command in commands:
+            print(f"  {command}")
+    sys.exit(1 if failures else 0)
@@ -1,56 +1,17 @@
 import random
+import sys
 import threading
 import time
-from enum import IntEnum
-
-class CardValue(IntEnum):
-    STRAZNICZKA = 1
-    KAPLAN = 2
-    BARON = 3
-    POKOJOWKA = 4
-    KSIAZE = 5
-    KROL = 6
-    HRABINA = 7
-    KSIEZNICZKA = 8
-
-class Card:
-    def __init__(self, value):
-        self.value = value
-        self.name = self.get_name(value)
-        self.description = self.get_description(value)
-
-    @staticmethod
-    def get_name(value):
-        names = {
-            1: "Strażniczka",
-            2: "Kapłan",
-            3: "Baron",
-            4: "Pokojówka",
-            5: "Książę",
-            6: "Król",
-            7: "Hrabina",
-            8: "Księżniczka"
-        }
-        return names.get(value, "Nieznana")
-
-    @staticmethod
-    def get_description(value):
-        descriptions = {
-            1: "Zgadnij kartę innego gracza (nie Strażniczka).",
-            2: "Podglądnij rękę innego gracza.",
-            3: "Porównaj ręce z innym graczem; niższa odpada.",
-            4: "Ignoruj wszystkie efekty do twojej następnej tury.",
-            5: "Wybierz gracza, aby odrzucił rękę.",
-            6: "Wymień się ręką z innym graczem.",
-            7: "Musi być odrzucona jeśli masz Króla lub Księcia.",
-            8: "Jeśli odrzucisz tę kartę, odpadasz."
-        }
-        return descriptions.get(value, "")
-    
-    def __repr__(self):
-        return f"{self.name} ({self.value})"
+import uuid
+from collections import deque
+from cards import CARD_COUNTS, Card
+from cards import CARD_DESCRIPTIONS, CARD_NAMES, CardValue # noqa: F401 - re-exported for older imports
+
+MAX_LOGS = 50
 
 class Player:
+    __slots__ = ('name', 'sid', 'is_host', 'hand', 'discarded', 'is_out', 'is_protected', 'score', 'private_message')
+
     def __init__(self, name, sid, is_host=False):
         self.name = name
         self.sid = sid # Streamlit Session ID or UUID
@@ -78,14 +39,20 @@ class Player:
         self.private_message = None
 
 class Game:
-    def __init__(self, lobby_id):
+    __slots__ = ('lobby_id', 'rng', 'players', 'deck', 'turn_index', 'game_started', 'game_over', 'logs',
+                 'listeners', 'log_seq', 'removed_card', 'last_action', 'lock', 'last_activity', 'round_end_time')
+
+    def __init__(self, lobby_id, rng=None):
         self.lobby_id = lobby_id
+        self.rng = rng or random # Pass random.Random(seed) for reproducible deals
         self.players = []
         self.deck = []
         self.turn_index = 0
         self.game_started = False
         self.game_over = False
-        self.logs = []
+        self.logs = deque(maxlen=MAX_LOGS)
+        self.listeners = [] # Callables listener(event, data), see emit()
+        self.log_seq = 0 # Total messages ever logged, lets clients fetch only new ones
         self.removed_card = None 
         self.last_action = None # { 'player_name': str, 'card_value': int, 'target_name': str, 'description': str }
         self.lock = threading.Lock()
@@ -94,11 +61,12 @@ class Game:
 
     def add_player(self, player):
         with self.lock:
-            if not self.game_started and len(self.players) < 4:
+            if not self.game_started and len(self.players) < 4 and not self.get_player_by_sid(player.sid):
                 # First player is host
                 if not self.players:
                     player.is_host = True
                 self.players.append(player)
+                self.last_activity = time.time()
                 return True
             return False
 
@@ -114,50 +82,25 @@ class Game:
                 return False
 
             removed_player = self.players.pop(player_index)
+            self.last_activity = time.time()
             self.log(f"Gracz {removed_player.name} opuścił grę.")
 
             # If game is running, we need to handle this
             if self.game_started and not self.game_over:
-                # If it was their turn, move to next
-                if self.turn_index == player_index:
-                    # We need to adjust turn_index because list shrank
-                    # Actually, if we pop, the next player falls into this index.
-                    # So we don't need to increment, just validate.
-                    if self.turn_index >= len(self.players):
-                        self.turn_index = 0
-                    
-                    # Force next turn logic (e.g. if they left mid-turn)
-                    # We might need to start a new turn for the new current player
-                    if self.players:
-                         # It's messy to restart turn logic here, 
-                         # simplest is to just ensure index is valid and maybe give them a card if they need one?
-                         # Or just let 'next_turn' handle it if we call it.
-                         # But `next_turn` draws a card.
-                         
-                         # Best approach: Just mark them is_out instead of removing?
-                         # User asked: "reszta graczy moze kontynuowac"
-                         # Removing is cleaner for "Next Round".
-                         pass
-                
-                elif self.turn_index > player_index:
+                was_turn = self.turn_index == player_index
+                if self.turn_index > player_index:
                     self.turn_index -= 1
-                
-                # Check win condition immediately
-                self.check_round_end()
-                
-                # If game continues and it was their turn, the new player at turn_index needs to start turn
-                # The next player is now at self.turn_index (since list shifted)
-                if self.players:
-                    # Draw a card for the new active player if they don't have 2 (standard turn start)
-                    current_player = self.players[self.turn_index]
-                    current_player.is_protected = False
-                    current_player.private_message = None
-                    if self.deck:
-                         current_player.draw(self.deck.pop(0))
-                    elif self.removed_card and not self.deck:
-                         # Edge case: empty deck
-                         self.end_round()
-            
+                if self.players and self.turn_index >= len(self.players):
+                    self.turn_index = 0
+
+                # Their cards leave with them; the round may be decided now
+                if not self.check_round_end() and was_turn:
+                    # The next player (now at their index) starts a normal turn
+                    self.turn_index = (self.turn_index - 1) % len(self.players)
+                    self.next_turn()
+            elif self.turn_index > player_index:
+                self.turn_index -= 1 # Keep who starts the next round
+
             # If host left, assign new host
             if removed_player.is_host and self.players:
                 self.players[0].is_host = True
@@ -175,10 +118,20 @@ class Game:
                 return p
         return None
 
+    def emit(self, event, **data):
+        # Structured action events for trackers, bots and analytics.
+        # Events: round_start, discard, play, guard, peek, baron, prince, swap, round_end
+        for listener in tuple(self.listeners): # A listener may unregister itself
+            listener(event, data)
+
+    def reveal(self, player, cards):
+        # Put cards on the player's (public) discard pile
+        player.discarded.extend(cards)
+        self.emit('discard', player=player, values=[c.value for c in cards])
+
     def log(self, message):
         self.logs.append(message)
-        if len(self.logs) > 50:
-            self.logs.pop(0)
+        self.log_seq += 1
 
     def start_game(self):
         with self.lock:
@@ -189,14 +142,12 @@ class Game:
             return True
 
     def start_round(self):
-        # 5x1, 2x2, 2x3, 2x4, 2x5, 1x6, 1x7, 1x8
-        counts = {1: 5, 2: 2, 3: 2, 4: 2, 5: 2, 6: 1, 7: 1, 8: 1}
         self.deck = []
-        for val, count in counts.items():
+        for val, count in CARD_COUNTS.items():
             for _ in range(count):
                 self.deck.append(Card(val))
         
-        random.shuffle(self.deck)
+        self.rng.shuffle(self.deck)
         
         for p in self.players:
             p.reset_round()
@@ -214,11 +165,13 @@ class Game:
         if self.turn_index >= len(self.players):
             self.turn_index = 0
             
-        self.players[self.turn_index].draw(self.deck.pop(0))
+        if self.deck:
+            self.players[self.turn_index].draw(self.deck.pop(0))
         self.log(f"Rozpoczęto nową rundę. Tura: {self.players[self.turn_index].name}")
         self.game_over = False
         self.round_end_time = None
         self.last_action = None
+        self.emit('round_start')
 
     def next_turn(self):
         if self.check_round_end():
@@ -236,14 +189,14 @@ class Game:
         current_player.is_protected = False
         current_player.private_message = None # Clear old messages
         
-        if self.deck:
-            card = self.deck.pop(0)
-            current_player.draw(card)
-        else:
-            self.end_round() # Should be caught by check_round_end but strictly speaking deck empty triggers end
+        # An empty deck already ended the round in check_round_end
+        card = self.deck.pop(0)
+        current_player.draw(card)
 
     def play_card(self, player_sid, card_index, target_sid=None, guess_value=None):
         with self.lock:
+            if not self.game_started or self.game_over:
+                return False, "Runda nie trwa."
             player = self.get_player_by_sid(player_sid)
             if not player or player != self.players[self.turn_index]:
                 return False, "To nie twoja tura."
@@ -261,14 +214,19 @@ class Game:
                     return False, "Musisz zagrać Hrabinę (7)."
 
             target = None
-            if target_sid:
+            if target_sid and card.value in [1, 2, 3, 5, 6]:
                 target = self.get_player_by_sid(target_sid)
-                # Validation logic is handled mostly by UI, but double check
-                if not target or target.is_out or (target.is_protected and target != player):
-                     pass # Effect might be nullified
+                # Validation logic is handled mostly by UI, but double check.
+                # A protected target is allowed, the effect is just nullified.
+                if not target or target.is_out or (target is player and card.value != 5):
+                    return False, "Nieprawidłowy cel."
+            if card.value == 1 and guess_value is not None and guess_value not in range(2, 9):
+                return False, "Nieprawidłowy typ."
 
             played_card = player.discard(card_index)
-            player.discarded.append(played_card)
+            self.last_activity = time.time()
+            self.reveal(player, [played_card])
+            self.emit('play', player=player, value=played_card.value, target=target, guess=guess_value)
             self.log(f"{player.name} zagrywa {played_card.name}.")
 
             effect_msg = self.execute_effect(player, played_card, target, guess_value)
@@ -289,15 +247,40 @@ class Game:
             
             return True, "Zagrano kartę."
 
+    def legal_moves(self, player):
+        # All (card_index, target_sid, guess_value) the UI would let the player submit
+        values = [c.value for c in player.hand]
+        must_play_countess = 7 in values and (5 in values or 6 in values)
+        others = [p for p in self.players if p is not player and not p.is_out and not p.is_protected]
+        moves = []
+        for i, card in enumerate(player.hand):
+            if must_play_countess and card.value != 7:
+                continue
+            if card.value in [1, 2, 3, 6]:
+                if not others:
+                    moves.append((i, None, None))
+                for t in others:
+                    if card.value == 1:
+                        moves.extend((i, t.sid, guess) for guess in range(2, 9))
+                    else:
+                        moves.append((i, t.sid, None))
+            elif card.value == 5:
+                moves.extend((i, t.sid, None) for t in others + [player])
+            else:
+                moves.append((i, None, None))
+        return moves
+
     def execute_effect(self, player, card, target, guess_value):
         if card.value == 1: # Guard
             if not target: return None
             if target.is_protected: return f"{target.name} jest chroniony."
             if not guess_value: return None
             
-            if target.hand and target.hand[0].value == guess_value:
+            hit = bool(target.hand) and target.hand[0].value == guess_value
+            self.emit('guard', player=player, target=target, guess=guess_value, hit=hit)
+            if hit:
                 target.is_out = True
-                target.discarded.extend(target.hand)
+                self.reveal(target, target.hand)
                 target.hand = []
                 return f"{player.name} zgadł! {target.name} ma {Card.get_name(guess_value)} i odpada!"
             else:
@@ -309,6 +292,7 @@ class Game:
             
             if target.hand:
                 seen_card = target.hand[0]
+                self.emit('peek', player=player, target=target, value=seen_card.value) # Private to player
                 player.private_message = f"Podglądasz rękę {target.name}: {seen_card.name} ({seen_card.value})"
                 return f"{player.name} podgląda rękę {target.name}."
             return "Błąd: Cel nie ma kart."
@@ -320,14 +304,16 @@ class Game:
             p_val = player.hand[0].value
             t_val = target.hand[0].value
             
+            loser = target if p_val > t_val else player if t_val > p_val else None
+            self.emit('baron', player=player, target=target, loser=loser, values=(p_val, t_val)) # values private to the pair
             if p_val > t_val:
                 target.is_out = True
-                target.discarded.extend(target.hand)
+                self.reveal(target, target.hand)
                 target.hand = []
                 return f"Baron: {player.name} wygrywa z {target.name}. {target.name} miał {Card.get_name(t_val)} i odpada."
             elif t_val > p_val:
                 player.is_out = True
-                player.discarded.extend(player.hand)
+                self.reveal(player, player.hand)
                 player.hand = []
                 return f"Baron: {target.name} wygrywa z {player.name}. {player.name} miał {Card.get_name(p_val)} i odpada."
             else:
@@ -343,7 +329,8 @@ class Game:
 
             discarded = target.hand.pop(0) if target.hand else None
             if discarded:
-                target.discarded.append(discarded)
+                self.reveal(target, [discarded])
+                self.emit('prince', player=player, target=target, value=discarded.value)
                 msg = f"{target.name} odrzuca {discarded.name}."
                 if discarded.value == 8: # Princess
                     target.is_out = True
@@ -361,11 +348,12 @@ class Game:
             if not target: return None
             if target.is_protected: return f"{target.name} jest chroniony."
             player.hand, target.hand = target.hand, player.hand
+            self.emit('swap', player=player, target=target) # Each side now holds the other's old card
             return f"{player.name} wymienia się ręką z {target.name}."
 
         elif card.value == 8: # Princess
             player.is_out = True
-            player.discarded.extend(player.hand)
+            self.reveal(player, player.hand)
             player.hand = []
             return f"{player.name} odrzuca Księżniczkę i odpada!"
 
@@ -411,6 +399,7 @@ class Game:
             self.round_end_time = time.time()
             for w in winners:
                 w.score += 1
+            self.emit('round_end', winners=winners)
             winner_names = ", ".join([w.name for w in winners]) if winners else "Nikt"
             self.log(f"KONIEC RUNDY. Zwycięzcy: {winner_names}")
             return True
@@ -420,8 +409,115 @@ class Game:
     def try_auto_restart(self):
         # Called periodically by Streamlit app
         with self.lock:
-            if self.game_over and self.round_end_time:
+            if self.game_over and self.round_end_time and len(self.players) >= 2:
                 # Restart after 5 seconds
                 if time.time() - self.round_end_time > 5:
                     self.start_round()
 
+
+def approx_size(game):
+    # Bytes held by one lobby. Cards are shared instances, so only list slots count for them.
+    with game.lock: # Sessions on other threads append to logs and players meanwhile
+        logs = list(game.logs)
+        players = list(game.players)
+        last_action = game.last_action
+    size = sys.getsizeof(game) + sys.getsizeof(game.lobby_id) + sys.getsizeof(game.lock)
+    size += sys.getsizeof(game.players) + sys.getsizeof(game.deck) + sys.getsizeof(game.listeners)
+    size += sys.getsizeof(game.logs) + sum(sys.getsizeof(m) for m in logs)
+    if last_action:
+        size += sys.getsizeof(last_action)
+        size += sum(sys.getsizeof(v) for v in last_action.values() if isinstance(v, str))
+    for p in players:
+        size += sys.getsizeof(p) + sys.getsizeof(p.name) + sys.getsizeof(p.sid)
+        size += sys.getsizeof(p.hand) + sys.getsizeof(p.discarded)
+        if p.private_message:
+            size += sys.getsizeof(p.private_message)
+    return size
+
+class GameManager:
+    IDLE_TIMEOUT = 30 * 60 # Seconds without a join, leave or play before a lobby with players can be evicted
+    REFRESH_PER_CREATE = 8 # Cached sizes re-measured per create, round robin
+
+    def __init__(self, max_bytes=None, clock=time.time, store=None):
+        self.lobbies = {} # lobby_id -> Game
+        self.store = store # analytics.ColumnStore recording the rounds of every lobby, or None
+        self.max_bytes = max_bytes # Evict empty or idle lobbies above this, None = no limit
+        self.clock = clock
+        self.sizes = {} # lobby_id -> (state stamp, bytes), recomputed only when the lobby changed
+        self.total = 0 # Sum of the cached sizes
+        self.refresh_order = deque() # Lobby ids whose cached size is re-measured next
+        # Guards lobbies, sizes, total and refresh_order; sessions create and remove
+        # lobbies from many threads. Reentrant: create_lobby goes through enforce_budget.
+        self.lock = threading.RLock()
+
+    def create_lobby(self):
+        with self.lock:
+            self.enforce_budget()
+            lobby_id = str(uuid.uuid4())[:6].upper()
+            game = self.lobbies[lobby_id] = Game(lobby_id)
+            if self.store is not None:
+                from analytics import Recorder # numpy only for managers that record
+                Recorder(game, self.store)
+            self.lobby_size(lobby_id)
+            self.refresh_order.append(lobby_id)
+            return lobby_id
+
+    def get_game(self, lobby_id):
+        return self.lobbies.get(lobby_id)
+
+    def remove_lobby(self, lobby_id):
+        with self.lock:
+            cached = self.sizes.pop(lobby_id, None)
+            if cached:
+                self.total -= cached[1]
+            return self.lobbies.pop(lobby_id, None)
+
+    def lobby_size(self, lobby_id):
+        with self.lock:
+            game = self.lobbies[lobby_id]
+            stamp = (game.log_seq, len(game.players), game.last_activity)
+            cached = self.sizes.get(lobby_id)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            size = approx_size(game)
+            self.total += size - (cached[1] if cached else 0)
+            self.sizes[lobby_id] = (stamp, size)
+            return size
+
+    def memory_usage(self):
+        with self.lock:
+            lobbies = {lobby_id: self.lobby_size(lobby_id) for lobby_id in self.lobbies}
+            self.total = sum(lobbies.values()) # Rebuilt, so the running total cannot drift
+            return {'lobbies': lobbies, 'total': self.total, 'count': len(lobbies)}
+
+    def refresh_some(self, count):
+        # Re-measure a few lobbies so the running total follows games as they change
+        with self.lock:
+            for _ in range(min(count, len(self.refresh_order))):
+                lobby_id = self.refresh_order.popleft()
+                if lobby_id in self.lobbies:
+                    self.lobby_size(lobby_id)
+                    self.refresh_order.append(lobby_id)
+
+    def enforce_budget(self):
+        # Drop lobbies nobody uses: empty ones first, then idle past IDLE_TIMEOUT, oldest activity first.
+        # A finished round with players still seated is only the pause before try_auto_restart.
+        if self.max_bytes is None:
+            return []
+        with self.lock:
+            self.refresh_some(self.REFRESH_PER_CREATE)
+            if self.total <= self.max_bytes:
+                return []
+            self.memory_usage() # Over budget by the running total, make it exact before evicting
+            if self.total <= self.max_bytes:
+                return []
+            idle_since = self.clock() - self.IDLE_TIMEOUT
+            unused = [g for g in self.lobbies.values() if not g.players or g.last_activity < idle_since]
+            unused.sort(key=lambda g: (bool(g.players), g.last_activity))
+            evicted = []
+            for game in unused:
+                if self.total <= self.max_bytes:
+                    break
+                self.remove_lobby(game.lobby_id)
+                evicted.append(game.lobby_id)
+            return evicted
@@ -0,0 +1,471 @@
+import asyncio
+import json
+import secrets
+import uuid
+from game_logic import MAX_LOGS, GameManager, Player
+
+# Line-delimited JSON over plain TCP. Every message is one JSON object per line.
+#
+# Client -> server:
+#   {"op": "hello", "name": str, "sid": str, "token": str}  - sid and token only to reconnect
+#   {"op": "create"}
+#   {"op": "join", "lobby": str}
+#   {"op": "start"}
+#   {"op": "play", "card": int, "target": str | null, "guess": int | null}
+#   {"op": "leave"}
+#
+# Server -> client:
+#   {"type": "welcome", "sid": str, "token": str}  - keep the token secret, it reclaims the seat
+#   {"type": "joined", "lobby": str}
+#   {"type": "ok", "msg": str} / {"type": "error", "msg": str}
+#   {"type": "delta", "changes": {...}}  - only what changed since the last delta
+
+RESTART_DELAY = 5.1 # Slightly above Game.try_auto_restart threshold
+RECONNECT_GRACE = 5 * 60 # Seconds a dropped player keeps a seat in a running game
+
+
+def player_view(game, sid):
+    """Everything the player `sid` is allowed to see, as plain JSON data."""
+    me = game.get_player_by_sid(sid)
+    turn_sid = None
+    if game.game_started and game.players:
+        turn_sid = game.players[game.turn_index % len(game.players)].sid
+    return {
+        'lobby': game.lobby_id,
+        'started': game.game_started,
+        'over': game.game_over,
+        'turn': turn_sid,
+        'deck': len(game.deck),
+        'order': [p.sid for p in game.players],
+        'players': {
+            p.sid: {
+                'name': p.name,
+                'score': p.score,
+                'host': p.is_host,
+                'out': p.is_out,
+                'protected': p.is_protected,
+                'discarded': [c.value for c in p.discarded],
+            }
+            for p in game.players
+        },
+        'hand': [c.value for c in me.hand] if me else [],
+        'private': me.private_message if me else None,
+        'last_action': game.last_action,
+        'log_seq': game.log_seq,
+        'logs': list(game.logs),
+    }
+
+
+def diff_views(old, new):
+    """Changes turning `old` into `new`; logs are sent as new entries only."""
+    changes = {}
+    for key, value in new.items():
+        if key in ('players', 'logs'):
+            continue
+        if old.get(key) != value:
+            changes[key] = value
+
+    players = {}
+    old_players = old.get('players', {})
+    for sid, fields in new['players'].items():
+        prev = old_players.get(sid)
+        if prev is None:
+            players[sid] = fields
+        else:
+            changed = {f: v for f, v in fields.items() if prev.get(f) != v}
+            if changed:
+                players[sid] = changed
+    for sid in old_players:
+        if sid not in new['players']:
+            players[sid] = None
+    if players:
+        changes['players'] = players
+
+    new_count = min(new['log_seq'] - old.get('log_seq', 0), len(new['logs']))
+    if new_count > 0:
+        changes['logs'] = new['logs'][-new_count:]
+    return changes
+
+
+def apply_delta(view, changes):
+    """Client side counterpart of diff_views."""
+    for key, value in changes.items():
+        if key == 'players':
+            players = view.setdefault('players', {})
+            for sid, fields in value.items():
+                if fields is None:
+                    players.pop(sid, None)
+                else:
+                    players.setdefault(sid, {}).update(fields)
+        elif key == 'logs':
+            logs = view.setdefault('logs', [])
+            logs.extend(value)
+            del logs[:-MAX_LOGS]
+        else:
+            view[key] = value
+    return view
+
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False).encode() + b"\n"
+
+
+class Session:
+    __slots__ = ('sid', 'name', 'writer', 'lobby_id', 'view')
+
+    def __init__(self, sid, name, writer):
+        self.sid = sid
+        self.name = name
+        self.writer = writer
+        self.lobby_id = None
+        self.view = {}
+
+    def send(self, message):
+        if self.writer.is_closing():
+            return
+        self.writer.write(encode(message))
+
+
+class GameServer:
+    def __init__(self, manager=None, host="127.0.0.1", port=8765, reconnect_grace=RECONNECT_GRACE):
+        self.manager = manager or GameManager()
+        self.host = host
+        self.port = port
+        self.reconnect_grace = reconnect_grace
+        self.sessions = {} # sid -> Session, connected only
+        self.tokens = {} # sid -> reconnect token handed out in welcome
+        self.seats = {} # sid -> lobby_id, kept while the player is disconnected
+        self.subscribers = {} # lobby_id -> set of sids
+        self.restart_tasks = {} # lobby_id -> asyncio.Task
+        self.expiry_tasks = {} # sid -> asyncio.Task freeing a kept seat
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if not self.server:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        for task in list(self.restart_tasks.values()) + list(self.expiry_tasks.values()):
+            task.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # --- Connection handling ---
+
+    async def handle_client(self, reader, writer):
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Line over the stream limit; the reader already dropped it
+                    writer.write(encode({'type': 'error', 'msg': "Wiadomość za długa."}))
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    msg = None
+                if not isinstance(msg, dict):
+                    writer.write(encode({'type': 'error', 'msg': "Niepoprawny JSON."}))
+                    await writer.drain()
+                    continue
+                if session is None:
+                    session = self.hello(msg, writer)
+                else:
+                    self.dispatch(session, msg)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if session and self.sessions.get(session.sid) is session:
+                self.disconnect(session)
+            writer.close()
+
+    def hello(self, msg, writer):
+        name, sid, token = msg.get('name'), msg.get('sid'), msg.get('token')
+        if msg.get('op') != 'hello' or not isinstance(name, str) or not name.strip():
+            writer.write(encode({'type': 'error', 'msg': "Najpierw wyslij hello z nickiem."}))
+            return None
+        if sid:
+            # Reconnect: only with the token this sid was given
+            known = self.tokens.get(sid) if isinstance(sid, str) else None
+            if not known or not isinstance(token, str) or not secrets.compare_digest(known.encode(), token.encode()):
+                writer.write(encode({'type': 'error', 'msg': "Nieprawidłowy token."}))
+                return None
+            expiry = self.expiry_tasks.pop(sid, None)
+            if expiry:
+                expiry.cancel()
+        else:
+            sid = str(uuid.uuid4())[:8]
+            self.tokens[sid] = secrets.token_hex(16)
+        old = self.sessions.get(sid)
+        if old:
+            old.writer.close() # Same player on a new connection
+        session = Session(sid, name, writer)
+        self.sessions[sid] = session
+        session.send({'type': 'welcome', 'sid': sid, 'token': self.tokens[sid]})
+        lobby_id = self.seats.get(sid)
+        if lobby_id:
+            game = self.manager.get_game(lobby_id)
+            if game and game.get_player_by_sid(sid):
+                # Take the kept seat back and resend full state
+                self.subscribe(session, lobby_id)
+                session.send({'type': 'joined', 'lobby': lobby_id})
+                self.push(session)
+            else:
+                del self.seats[sid]
+        return session
+
+    def disconnect(self, session):
+        del self.sessions[session.sid]
+        game = self.manager.get_game(session.lobby_id) if session.lobby_id else None
+        if game and game.game_started:
+            # Seats in a running game stay in self.seats so the player can
+            # reconnect, until the grace period runs out
+            self.subscribers.get(session.lobby_id, set()).discard(session.sid)
+            self.expiry_tasks[session.sid] = asyncio.get_running_loop().create_task(self.expire_seat(session))
+        else:
+            self.leave(session)
+            self.tokens.pop(session.sid, None)
+
+    async def expire_seat(self, session):
+        # Cancelled by hello when the player reconnects in time
+        await asyncio.sleep(self.reconnect_grace)
+        del self.expiry_tasks[session.sid]
+        self.leave(session)
+        self.tokens.pop(session.sid, None)
+
+    def dispatch(self, session, msg):
+        op = msg.get('op')
+        handler = None if not isinstance(op, str) else {
+            'create': self.create,
+            'join': self.join,
+            'start': self.start_game,
+            'play': self.play,
+            'leave': self.leave,
+        }.get(op)
+        if not handler:
+            session.send({'type': 'error', 'msg': f"Nieznana operacja: {op}"})
+            return
+        handler(session, msg)
+
+    # --- Operations ---
+
+    def create(self, session, msg):
+        if session.lobby_id:
+            session.send({'type': 'error', 'msg': "Jesteś już w lobby."})
+            return
+        lobby_id = self.manager.create_lobby()
+        self.join(session, {'lobby': lobby_id})
+
+    def join(self, session, msg):
+        lobby_id = str(msg.get('lobby', '')).upper()
+        game = self.manager.get_game(lobby_id)
+        if session.lobby_id:
+            session.send({'type': 'error', 'msg': "Jesteś już w lobby."})
+        elif not game:
+            session.send({'type': 'error', 'msg': "Nie ma takiego lobby."})
+        elif not game.add_player(Player(session.name, session.sid)):
+            session.send({'type': 'error', 'msg': "Lobby pełne lub gra już trwa."})
+        else:
+            self.subscribe(session, lobby_id)
+            session.send({'type': 'joined', 'lobby': lobby_id})
+            self.broadcast(lobby_id)
+
+    def start_game(self, session, msg):
+        game = self.game_of(session)
+        if not game:
+            return
+        me = game.get_player_by_sid(session.sid)
+        if not me or not me.is_host:
+            session.send({'type': 'error', 'msg': "Tylko gospodarz może rozpocząć grę."})
+        elif game.game_started:
+            session.send({'type': 'error', 'msg': "Gra już trwa."})
+        elif not game.start_game():
+            session.send({'type': 'error', 'msg': "Potrzeba min. 2 graczy."})
+        else:
+            self.broadcast(session.lobby_id)
+
+    def play(self, session, msg):
+        game = self.game_of(session)
+        if not game:
+            return
+        if not game.game_started or game.game_over:
+            session.send({'type': 'error', 'msg': "Runda nie trwa."})
+            return
+        try:
+            card_index = int(msg.get('card', -1))
+            guess = int(msg['guess']) if msg.get('guess') is not None else None
+        except (TypeError, ValueError):
+            session.send({'type': 'error', 'msg': "Nieprawidłowa karta."})
+            return
+        success, text = game.play_card(session.sid, card_index, msg.get('target'), guess)
+        session.send({'type': 'ok' if success else 'error', 'msg': text})
+        if success:
+            self.broadcast(session.lobby_id)
+
+    def leave(self, session, msg=None):
+        lobby_id = session.lobby_id
+        if not lobby_id:
+            return
+        self.subscribers.get(lobby_id, set()).discard(session.sid)
+        self.seats.pop(session.sid, None)
+        session.lobby_id = None
+        session.view = {}
+        game = self.manager.get_game(lobby_id)
+        if game:
+            game.remove_player(session.sid)
+            if not game.players:
+                self.manager.remove_lobby(lobby_id)
+                self.subscribers.pop(lobby_id, None)
+                return
+            self.broadcast(lobby_id)
+
+    # --- Push ---
+
+    def game_of(self, session):
+        game = self.manager.get_game(session.lobby_id) if session.lobby_id else None
+        if not game:
+            session.send({'type': 'error', 'msg': "Nie jesteś w lobby."})
+        return game
+
+    def subscribe(self, session, lobby_id):
+        session.lobby_id = lobby_id
+        session.view = {}
+        self.seats[session.sid] = lobby_id
+        self.subscribers.setdefault(lobby_id, set()).add(session.sid)
+
+    def push(self, session):
+        game = self.manager.get_game(session.lobby_id)
+        if not game:
+            return
+        view = player_view(game, session.sid)
+        changes = diff_views(session.view, view)
+        session.view = view
+        if changes:
+            session.send({'type': 'delta', 'changes': changes})
+
+    def broadcast(self, lobby_id):
+        for sid in list(self.subscribers.get(lobby_id, ())):
+            session = self.sessions.get(sid)
+            if session:
+                self.push(session)
+        game = self.manager.get_game(lobby_id)
+        if game and game.game_over and lobby_id not in self.restart_tasks:
+            self.restart_tasks[lobby_id] = asyncio.get_running_loop().create_task(self.auto_restart(lobby_id))
+
+    async def auto_restart(self, lobby_id):
+        try:
+            await asyncio.sleep(RESTART_DELAY)
+        finally:
+            self.restart_tasks.pop(lobby_id, None)
+        game = self.manager.get_game(lobby_id)
+        if game and game.players:
+            game.try_auto_restart()
+            self.broadcast(lobby_id)
+
+
+class ScriptedClient:
+    """Minimal client for tests and bots: sends ops and mirrors the state from deltas."""
+
+    def __init__(self, name, host="127.0.0.1", port=8765):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.sid = None
+        self.token = None
+        self.lobby_id = None
+        self.view = {}
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, sid=None, token=None):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        await self.send({'op': 'hello', 'name': self.name, 'sid': sid, 'token': token})
+        welcome = await self.expect('welcome')
+        self.sid, self.token = welcome['sid'], welcome['token']
+        return self
+
+    async def reconnect(self):
+        """New connection to the same seat; the view is rebuilt from a full delta."""
+        await self.close()
+        self.view = {}
+        return await self.connect(self.sid, self.token)
+
+    async def send(self, message):
+        self.writer.write(encode(message))
+        await self.writer.drain()
+
+    async def receive(self, timeout=5):
+        line = await asyncio.wait_for(self.reader.readline(), timeout)
+        if not line:
+            raise ConnectionError("Serwer zamknął połączenie.")
+        msg = json.loads(line)
+        if msg['type'] == 'delta':
+            apply_delta(self.view, msg['changes'])
+        elif msg['type'] == 'joined':
+            self.lobby_id = msg['lobby']
+        return msg
+
+    async def expect(self, msg_type, timeout=5):
+        """Read messages (applying deltas on the way) until one of `msg_type` arrives."""
+        while True:
+            msg = await self.receive(timeout)
+            if msg['type'] == msg_type:
+                return msg
+            if msg['type'] == 'error' and msg_type != 'error':
+                raise RuntimeError(msg['msg'])
+
+    async def wait_for(self, predicate, timeout=10):
+        """Apply deltas until predicate(view) holds."""
+        while not predicate(self.view):
+            await self.receive(timeout)
+        return self.view
+
+    async def run_script(self, ops):
+        """Send each op in turn and collect the first non-delta reply to it."""
+        replies = []
+        for op in ops:
+            await self.send(op)
+            msg = await self.receive()
+            while msg['type'] == 'delta':
+                msg = await self.receive()
+            replies.append(msg)
+        return replies
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serwer gry List Miłosny (JSON po TCP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--analytics", default=None, help="Record every played round into this analytics store.")
+    args = parser.parse_args()
+
+    store = None
+    if args.analytics:
+        from analytics import LIVE_COMMIT_SECONDS, ColumnStore
+        store = ColumnStore(args.analytics, commit_every=LIVE_COMMIT_SECONDS)
+    try:
+        asyncio.run(GameServer(GameManager(store=store), args.host, args.port).serve_forever())
+    finally:
+        if store:
+            store.close()
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+from game_logic import Player
+
+# Quick play: players wait in a FIFO queue and are seated into open quick-play
+# lobbies. Open lobbies are indexed by free seats, so seating a player checks at
+# most one bucket per table size instead of scanning every game. Lobbies created
+# with a code in the login screen stay private and are not indexed.
+
+
+class Matchmaker:
+    def __init__(self, manager, table_size=4, max_wait=30.0, clock=time.time):
+        self.manager = manager
+        self.table_size = table_size # Start as soon as a table has this many players
+        self.max_wait = max_wait # ... or this many seconds after it opened, with at least 2
+        self.clock = clock
+        self.queue = deque() # (sid, name) in arrival order
+        self.waiting = {} # sid -> name; cancelled entries are skipped when they reach the front
+        self.open = {free: {} for free in range(1, table_size + 1)} # free seats -> {lobby_id: None}, oldest first
+        self.free_of = {} # lobby_id -> bucket it is in
+        self.deadlines = deque() # (deadline, lobby_id), lobbies open in order so deadlines are sorted
+        self.overdue = set() # Past the deadline but still alone at the table
+        self.seated = {} # sid -> lobby_id, until the player leaves
+        self.lock = threading.RLock() # Streamlit sessions call in from several threads
+
+    # --- Queue ---
+
+    def enqueue(self, sid, name):
+        with self.lock:
+            if sid in self.waiting or sid in self.seated:
+                return False
+            self.waiting[sid] = name
+            self.queue.append((sid, name))
+            return True
+
+    def cancel(self, sid):
+        with self.lock:
+            return self.waiting.pop(sid, None) is not None
+
+    def lobby_of(self, sid):
+        return self.seated.get(sid)
+
+    def forget(self, sid):
+        # Player left their quick-play lobby
+        with self.lock:
+            self.cancel(sid)
+            lobby_id = self.seated.pop(sid, None)
+            if lobby_id:
+                self.refresh(lobby_id)
+
+    # --- Open lobby index ---
+
+    def index(self, lobby_id, free):
+        old = self.free_of.pop(lobby_id, None)
+        if old is not None:
+            del self.open[old][lobby_id]
+        if free > 0:
+            self.open[free][lobby_id] = None
+            self.free_of[lobby_id] = free
+
+    def refresh(self, lobby_id):
+        """Re-bucket a lobby after something outside the matchmaker changed it."""
+        game = self.manager.get_game(lobby_id)
+        if game is None or game.game_started:
+            self.index(lobby_id, 0)
+            self.overdue.discard(lobby_id)
+        else:
+            self.index(lobby_id, self.table_size - len(game.players))
+
+    def take_open_lobby(self):
+        # Fullest table first, so tables fill up and start instead of spreading players thin
+        for free in range(1, self.table_size + 1):
+            bucket = self.open[free]
+            while bucket:
+                lobby_id = next(iter(bucket))
+                game = self.manager.get_game(lobby_id)
+                if game is not None and not game.game_started:
+                    return game
+                self.index(lobby_id, 0) # Evicted or started elsewhere
+        return None
+
+    def open_lobby(self, now):
+        lobby_id = self.manager.create_lobby()
+        self.index(lobby_id, self.table_size)
+        self.deadlines.append((now + self.max_wait, lobby_id))
+        return self.manager.get_game(lobby_id)
+
+    # --- Matching ---
+
+    def start(self, game):
+        self.index(game.lobby_id, 0)
+        self.overdue.discard(game.lobby_id)
+        if len(game.players) >= 2:
+            game.start_game()
+
+    def match(self, now=None):
+        """Seat everyone in the queue, then start tables that are full or waited long enough."""
+        with self.lock:
+            now = self.clock() if now is None else now
+            while self.queue:
+                sid, name = self.queue.popleft()
+                if self.waiting.pop(sid, None) is None:
+                    continue # Cancelled
+                game = self.take_open_lobby() or self.open_lobby(now)
+                if not game.add_player(Player(name, sid)):
+                    # Lost a race with a start or a manual join; try again from the front
+                    self.refresh(game.lobby_id)
+                    self.waiting[sid] = name
+                    self.queue.appendleft((sid, name))
+                    continue
+                self.seated[sid] = game.lobby_id
+                free = self.table_size - len(game.players)
+                if free <= 0 or (game.lobby_id in self.overdue and len(game.players) >= 2):
+                    self.start(game)
+                else:
+                    self.index(game.lobby_id, free)
+            self.tick(now)
+
+    def tick(self, now=None):
+        """Start lobbies whose wait deadline passed; call periodically."""
+        with self.lock:
+            now = self.clock() if now is None else now
+            while self.deadlines and self.deadlines[0][0] <= now:
+                _, lobby_id = self.deadlines.popleft()
+                if lobby_id not in self.free_of:
+                    continue # Already started or gone
+                game = self.manager.get_game(lobby_id)
+                if game is None or game.game_started:
+                    self.refresh(lobby_id)
+                elif len(game.players) >= 2:
+                    self.start(game)
+                else:
+                    # Start as soon as a second player shows up
+                    self.overdue.add(lobby_id)
+
@@ -0,0 +1,217 @@
+import itertools
+import mmap
+import os
+import random
+import struct
+from multiprocessing import Pool
+from game_logic import CARD_COUNTS, Card, Game, Player
+
+# Precomputed best plays for early-round situations.
+#
+# An information state is (number of players, own two cards, multiset of cards
+# visible on the discard piles). Each state maps to a fixed slot in a flat
+# binary file, so a lookup is one index computation and a two byte read from
+# an mmap - nothing is parsed at load time. Slots the job did not fill stay
+# zero and callers fall back to search.
+#
+# File layout: 8 byte header (magic, version, max discards) then one
+# (card value, argument) byte pair per slot. The argument is the guessed
+# value for a Guard and 1 for a Prince played on oneself, otherwise 0.
+
+MAGIC = b"LMOB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxx")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+MAX_DISCARDS = 2
+PLAYER_COUNTS = (2, 3, 4)
+
+HANDS = list(itertools.combinations_with_replacement(range(1, 9), 2))
+HAND_RANK = {hand: i for i, hand in enumerate(HANDS)}
+
+
+def discard_ranks(max_discards):
+    ranks = {}
+    for size in range(max_discards + 1):
+        for combo in itertools.combinations_with_replacement(range(1, 9), size):
+            ranks[combo] = len(ranks)
+    return ranks
+
+
+def slot_count(max_discards):
+    return len(PLAYER_COUNTS) * len(HANDS) * len(discard_ranks(max_discards))
+
+
+def state_index(players, hand, discards, ranks):
+    """Slot of an information state, or None if the book does not cover it."""
+    hand_rank = HAND_RANK.get(tuple(sorted(hand)))
+    discard_rank = ranks.get(tuple(sorted(discards)))
+    if hand_rank is None or discard_rank is None or players not in PLAYER_COUNTS:
+        return None
+    return ((players - 2) * len(HANDS) + hand_rank) * len(ranks) + discard_rank
+
+
+def is_possible(players, hand, discards):
+    left = dict(CARD_COUNTS)
+    for v in list(hand) + list(discards):
+        left[v] -= 1
+        if left[v] < 0:
+            return False
+    # Removed card, one card per opponent and at least one card still to draw
+    return sum(left.values()) >= 1 + (players - 1) + 1
+
+
+class OpeningBook:
+    def __init__(self, path=DEFAULT_PATH):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_discards = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an opening book (version {VERSION}).")
+        self.ranks = discard_ranks(self.max_discards)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def get(self, players, hand, discards):
+        """(card_value, argument) for the state, or None if it is not in the book."""
+        index = state_index(players, hand, discards, self.ranks)
+        if index is None:
+            return None
+        offset = HEADER.size + 2 * index
+        card, arg = self.data[offset], self.data[offset + 1]
+        return (card, arg) if card else None
+
+    def lookup(self, game, player):
+        # Only plain early-round positions are covered: nobody out or protected
+        if any(p.is_out or p.is_protected for p in game.players if p is not player):
+            return None
+        discards = [c.value for p in game.players for c in p.discarded]
+        return self.get(len(game.players), [c.value for c in player.hand], discards)
+
+
+# --- Offline job ---
+
+def candidate_actions(hand):
+    actions = []
+    values = set(hand)
+    if 7 in values and (5 in values or 6 in values):
+        values = {7}
+    for v in sorted(values):
+        if v == 1:
+            actions.extend((1, guess) for guess in range(2, 9))
+        elif v == 5:
+            actions.extend([(5, 0), (5, 1)])
+        else:
+            actions.append((v, 0))
+    return actions
+
+
+def deal_position(players, hand, discards, rng):
+    """A Game in which seat 0 holds `hand` and is on turn, consistent with the state."""
+    game = Game("BOOK", rng=rng)
+    for i in range(players):
+        game.add_player(Player(f"p{i}", f"p{i}"))
+    left = []
+    counts = dict(CARD_COUNTS)
+    for v in list(hand) + list(discards):
+        counts[v] -= 1
+    for v, count in counts.items():
+        left += [v] * count
+    rng.shuffle(left)
+
+    game.game_started = True
+    game.turn_index = 0
+    game.players[0].hand = [Card(v) for v in hand]
+    for i, v in enumerate(discards):
+        # Which opponent discarded what is not part of the state; spread them out
+        game.players[1 + i % (players - 1)].discarded.append(Card(v))
+    game.removed_card = Card(left.pop())
+    for p in game.players[1:]:
+        p.hand = [Card(left.pop())]
+    game.deck = [Card(v) for v in left]
+    return game
+
+
+def action_move(game, player, action, rng):
+    card, arg = action
+    moves = [m for m in game.legal_moves(player) if player.hand[m[0]].value == card]
+    if card == 1:
+        moves = [m for m in moves if m[2] in (arg, None)]
+    elif card == 5:
+        moves = [m for m in moves if (m[1] == player.sid) == (arg == 1)]
+    return rng.choice(moves) if moves else None
+
+
+def rollout(players, hand, discards, action, rng):
+    """Play the action, then finish the round with CautiousBot for everyone. 1 if seat 0 won."""
+    from bots import CautiousBot
+    game = deal_position(players, hand, discards, rng)
+    me = game.players[0]
+    move = action_move(game, me, action, rng)
+    if move is None:
+        return None
+    bots = {p.sid: CautiousBot(game, p.sid, rng) for p in game.players}
+    game.play_card(me.sid, *move)
+    while not game.game_over:
+        current = game.players[game.turn_index]
+        game.play_card(current.sid, *bots[current.sid].choose_move())
+    return me.score
+
+
+def solve_state(job):
+    """Best action of one state by Monte Carlo rollouts. Runs in a worker process."""
+    index, players, hand, discards, rollouts, seed = job
+    rng = random.Random(f"{seed}:{index}")
+    best, best_wins = None, -1
+    for action in candidate_actions(hand):
+        wins = 0
+        for _ in range(rollouts):
+            result = rollout(players, hand, discards, action, rng)
+            if result is None:
+                break
+            wins += result
+        else:
+            if wins > best_wins:
+                best, best_wins = action, wins
+    return index, best
+
+
+def build(path=DEFAULT_PATH, rollouts=100, seed=0, workers=None, max_discards=MAX_DISCARDS):
+    ranks = discard_ranks(max_discards)
+    jobs = []
+    for players in PLAYER_COUNTS:
+        for hand in HANDS:
+            for discards in ranks:
+                if is_possible(players, hand, discards):
+                    index = state_index(players, hand, discards, ranks)
+                    jobs.append((index, players, hand, discards, rollouts, seed))
+
+    table = bytearray(2 * slot_count(max_discards))
+    with Pool(workers) as pool:
+        for index, action in pool.imap_unordered(solve_state, jobs, chunksize=16):
+            if action:
+                table[2 * index], table[2 * index + 1] = action
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_discards))
+        f.write(table)
+    os.replace(tmp_path, path)
+    return len(jobs)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Buduje tablicę otwarć dla botów.")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    parser.add_argument("--rollouts", type=int, default=100, help="Rollouts per candidate action.")
+    parser.add_argument("--max-discards", type=int, default=MAX_DISCARDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    count = build(args.out, args.rollouts, args.seed, args.workers, args.max_discards)
+    print(f"{count} stanów zapisano do {args.out}")
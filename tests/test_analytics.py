@@ -0,0 +1,58 @@
+import random
+from analytics import ColumnStore, Recorder, group_stats, segment_dirs
+from game_logic import Game, GameManager, Player
+
+
+def play_round(game, rng):
+    while not game.game_over:
+        player = game.players[game.turn_index]
+        moves = game.legal_moves(player)
+        assert game.play_card(player.sid, *moves[rng.randrange(len(moves))])[0]
+
+
+def recorded_game(store, seed=0):
+    game = Game("TEST", rng=random.Random(seed))
+    Recorder(game, store)
+    for i in range(3):
+        game.add_player(Player(f"Gracz {i}", f"p{i}"))
+    game.start_game()
+    play_round(game, random.Random(seed))
+    return game
+
+
+def rows(root, table='rounds'):
+    return sum(count for count, _ in group_stats(root, table, ()).values())
+
+
+def test_rows_are_visible_only_after_commit(tmp_path):
+    root = str(tmp_path)
+    store = ColumnStore(root, segment_rows=2)
+    recorded_game(store)
+    # Full segments were written by extend(), but they are not committed
+    assert segment_dirs(root, 'rounds') == [] and rows(root) == 0
+    store.commit(["g0"])
+    assert rows(root) == 3
+
+    recorded_game(store, seed=1)
+    store.flush() # Written, never committed: lost with the process
+    reopened = ColumnStore(root, segment_rows=2)
+    assert rows(root) == 3 and reopened.games == ["g0"] and reopened.next_round == 1
+    recorded_game(reopened, seed=2)
+    reopened.close()
+    assert rows(root) == 6
+    assert sorted(group_stats(root, 'rounds', ('round',))) == [(0,), (1,)]
+
+
+def test_manager_records_every_lobby(tmp_path):
+    store = ColumnStore(str(tmp_path))
+    manager = GameManager(store=store)
+    for seed in range(3):
+        game = manager.get_game(manager.create_lobby())
+        game.rng = random.Random(seed)
+        game.add_player(Player("A", "a"))
+        game.add_player(Player("B", "b"))
+        game.start_game()
+        play_round(game, random.Random(seed))
+    store.commit()
+    assert rows(str(tmp_path)) == 6
+    assert rows(str(tmp_path), 'effects') > 0
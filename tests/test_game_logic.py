@@ -0,0 +1,145 @@
+import random
+from collections import Counter
+from game_logic import CARD_COUNTS, Card, Game, Player
+
+# Reproducers the fuzzer shrank down, one per engine fix.
+
+
+def started_game(count, seed=0):
+    game = Game("TEST", rng=random.Random(seed))
+    for i in range(count):
+        game.add_player(Player(f"Gracz {i}", f"p{i}"))
+    game.start_game()
+    return game
+
+
+def current(game):
+    return game.players[game.turn_index]
+
+
+def others(game):
+    return [p for p in game.players if p is not current(game)]
+
+
+def set_hand(player, *values):
+    player.hand = [Card(v) for v in values]
+
+
+def all_cards(game, *gone):
+    cards = [c.value for c in game.deck]
+    if game.removed_card:
+        cards.append(game.removed_card.value)
+    for p in list(game.players) + list(gone):
+        cards += [c.value for c in p.hand + p.discarded]
+    return Counter(cards)
+
+
+def test_baron_on_an_eliminated_player_is_rejected():
+    game = started_game(3)
+    player, target = current(game), others(game)[0]
+    set_hand(player, 3, 8)
+    target.is_out, target.hand = True, []
+    assert game.play_card(player.sid, 0, target.sid) == (False, "Nieprawidłowy cel.")
+    assert [c.value for c in player.hand] == [3, 8] and not player.is_out
+
+
+def test_king_on_an_eliminated_player_is_rejected():
+    game = started_game(3)
+    player, target = current(game), others(game)[0]
+    set_hand(player, 6, 8)
+    target.is_out, target.hand = True, []
+    assert game.play_card(player.sid, 0, target.sid) == (False, "Nieprawidłowy cel.")
+    assert [c.value for c in player.hand] == [6, 8] and target.hand == []
+
+
+def test_only_the_prince_targets_yourself():
+    game = started_game(2)
+    player = current(game)
+    set_hand(player, 1, 6)
+    assert game.play_card(player.sid, 0, player.sid, 2) == (False, "Nieprawidłowy cel.")
+    assert game.play_card(player.sid, 1, player.sid) == (False, "Nieprawidłowy cel.")
+    set_hand(player, 5, 2)
+    assert game.play_card(player.sid, 0, player.sid)[0]
+
+
+def test_guard_guess_must_be_two_to_eight():
+    game = started_game(2)
+    player, target = current(game), others(game)[0]
+    set_hand(player, 1, 2)
+    for guess in (0, 1, 9, -3):
+        assert game.play_card(player.sid, 0, target.sid, guess) == (False, "Nieprawidłowy typ.")
+    assert len(player.hand) == 2
+    assert game.play_card(player.sid, 0, target.sid, 8)[0]
+
+
+def test_no_plays_outside_a_round():
+    game = Game("TEST")
+    game.add_player(Player("A", "p0"))
+    game.add_player(Player("B", "p1"))
+    assert game.play_card("p0", 0) == (False, "Runda nie trwa.")
+    game.start_game()
+    game.game_over = True
+    assert game.play_card(current(game).sid, 0) == (False, "Runda nie trwa.")
+
+
+def test_rejoin_with_a_seated_sid_is_rejected():
+    game = Game("TEST")
+    assert game.add_player(Player("A", "p0"))
+    assert not game.add_player(Player("A again", "p0"))
+    assert [p.name for p in game.players] == ["A"]
+
+
+def test_leaving_out_of_turn_keeps_the_turn():
+    game = started_game(3, seed=1)
+    holder = current(game)
+    hand = list(holder.hand)
+    leaver = others(game)[-1]
+    assert game.remove_player(leaver.sid)
+    # Nobody draws for the leaver and the turn holder keeps playing
+    assert current(game) is holder and holder.hand == hand
+    assert [len(p.hand) for p in game.players] == [2 if p is holder else 1 for p in game.players]
+    assert all_cards(game, leaver) == Counter(CARD_COUNTS)
+
+
+def test_turn_holder_leaving_passes_the_turn():
+    game = started_game(3, seed=2)
+    leaver = current(game)
+    following = game.players[(game.turn_index + 1) % 3]
+    deck = len(game.deck)
+    assert game.remove_player(leaver.sid)
+    assert not game.game_over
+    assert current(game) is following and len(following.hand) == 2
+    assert len(game.deck) == deck - 1
+    assert all_cards(game, leaver) == Counter(CARD_COUNTS)
+
+
+def test_turn_passes_over_eliminated_players():
+    game = started_game(4, seed=4)
+    leaver = current(game)
+    skipped = game.players[(game.turn_index + 1) % 4]
+    following = game.players[(game.turn_index + 2) % 4]
+    skipped.discarded += skipped.hand
+    skipped.is_out, skipped.hand = True, []
+    assert game.remove_player(leaver.sid)
+    assert current(game) is following and len(following.hand) == 2
+    assert all_cards(game, leaver) == Counter(CARD_COUNTS)
+
+
+def test_turn_holder_leaving_on_an_empty_deck_ends_the_round():
+    game = started_game(3, seed=5)
+    leaver = current(game)
+    game.deck = []
+    low, high = others(game)
+    set_hand(low, 2)
+    set_hand(high, 7)
+    game.remove_player(leaver.sid)
+    assert game.game_over and (low.score, high.score) == (0, 1)
+    assert [len(p.hand) for p in game.players] == [1, 1]
+
+
+def test_last_opponent_leaving_ends_the_round():
+    game = started_game(2, seed=3)
+    stayer, leaver = current(game), others(game)[0]
+    game.remove_player(leaver.sid)
+    assert game.game_over and stayer.score == 1
+    assert len(stayer.hand) == 2 # No turn is started after the round ended
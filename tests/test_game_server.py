@@ -0,0 +1,185 @@
+import asyncio
+import json
+from game_server import GameServer, ScriptedClient
+
+
+def run(test, **options):
+    async def wrapper():
+        server = await GameServer(port=0, **options).start()
+        try:
+            await test(server)
+        finally:
+            await server.close()
+    asyncio.run(wrapper())
+
+
+async def clients(server, *names):
+    return [await ScriptedClient(name, port=server.port).connect() for name in names]
+
+
+async def two_player_game(server):
+    a, b = await clients(server, "Ala", "Bob")
+    await a.run_script([{'op': 'create'}])
+    await b.send({'op': 'join', 'lobby': a.lobby_id})
+    await b.expect('joined')
+    await a.send({'op': 'start'})
+    game = server.manager.get_game(a.lobby_id)
+    for c in (a, b):
+        await c.wait_for(lambda v: v.get('log_seq') == game.log_seq)
+    return a, b, game
+
+
+async def play_legal(server, game, client):
+    card, target, guess = game.legal_moves(game.get_player_by_sid(client.sid))[0]
+    await client.send({'op': 'play', 'card': card, 'target': target, 'guess': guess})
+    return await client.expect('ok')
+
+
+def test_create_join_start_sends_views():
+    async def test(server):
+        a, b, game = await two_player_game(server)
+        assert a.view['started'] and b.view['started']
+        assert a.view['order'] == b.view['order'] == [a.sid, b.sid]
+        assert a.view['hand'] == [c.value for c in game.get_player_by_sid(a.sid).hand]
+        assert b.view['hand'] == [c.value for c in game.get_player_by_sid(b.sid).hand]
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_play_deltas_keep_views_in_sync():
+    async def test(server):
+        a, b, game = await two_player_game(server)
+        by_sid = {a.sid: a, b.sid: b}
+        for _ in range(30):
+            if game.game_over:
+                break
+            await play_legal(server, game, by_sid[a.view['turn']])
+            for c in (a, b):
+                await c.wait_for(lambda v: v.get('log_seq') == game.log_seq)
+        assert a.view['logs'] == b.view['logs'] == list(game.logs)
+        assert a.view['players'] == b.view['players']
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_not_your_turn_is_an_error():
+    async def test(server):
+        a, b, game = await two_player_game(server)
+        waiting = b if a.view['turn'] == a.sid else a
+        await waiting.send({'op': 'play', 'card': 0, 'target': None, 'guess': None})
+        assert (await waiting.expect('error'))['msg'] == "To nie twoja tura."
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_leave_frees_the_lobby():
+    async def test(server):
+        a, b = await clients(server, "Ala", "Bob")
+        await a.run_script([{'op': 'create'}])
+        lobby_id = a.lobby_id
+        await b.send({'op': 'join', 'lobby': lobby_id})
+        await b.expect('joined')
+        await b.send({'op': 'leave'})
+        await a.wait_for(lambda v: len(v.get('order', ())) == 1)
+        await a.send({'op': 'leave'})
+        await a.send({'op': 'join', 'lobby': lobby_id})
+        assert (await a.expect('error'))['msg'] == "Nie ma takiego lobby."
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_reconnect_takes_the_seat_back():
+    async def test(server):
+        a, b, game = await two_player_game(server)
+        await a.close()
+        await asyncio.sleep(0.05) # Let the server see the drop
+        assert a.sid not in server.sessions and server.seats[a.sid] == game.lobby_id
+
+        await a.reconnect()
+        await a.wait_for(lambda v: v.get('log_seq') == game.log_seq)
+        assert a.lobby_id == game.lobby_id
+        assert a.view['hand'] == [c.value for c in game.get_player_by_sid(a.sid).hand]
+        # The reconnected seat can keep playing
+        if a.view['turn'] == a.sid:
+            await play_legal(server, game, a)
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_reconnect_needs_the_token():
+    async def test(server):
+        a, b, game = await two_player_game(server)
+        thief = ScriptedClient("Ewa", port=server.port)
+        for token in (None, "0" * 32, b.token):
+            try:
+                await thief.connect(a.sid, token)
+            except RuntimeError as e:
+                assert str(e) == "Nieprawidłowy token."
+            else:
+                raise AssertionError("took over a seat without its token")
+            await thief.close()
+        assert server.sessions[a.sid].name == "Ala"
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_malformed_input_keeps_the_connection():
+    async def test(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        for line in (b"nie json\n", b"[1, 2]\n", b"42\n", b'"hello"\n', b"x" * (1 << 17) + b"\n"):
+            writer.write(line)
+            await writer.drain()
+            reply = json.loads(await asyncio.wait_for(reader.readline(), 5))
+            assert reply['type'] == 'error'
+        bad_hellos = (
+            {'op': 'hello', 'name': "A", 'sid': [1]},
+            {'op': 'hello', 'name': "A", 'sid': {'a': 1}, 'token': "x"},
+            {'op': 'hello', 'name': "A", 'sid': "abc", 'token': ["x"]},
+            {'op': 'hello', 'name': "A", 'sid': "abc", 'token': "żółw"},
+            {'op': 'hello', 'name': {'first': "A"}},
+            {'op': 'hello', 'name': ["A"]},
+            {'op': 'hello', 'name': 42},
+            {'op': 'hello', 'name': "  "},
+            {'op': ['hello'], 'name': "A"},
+        )
+        for msg in bad_hellos:
+            writer.write(json.dumps(msg).encode() + b"\n")
+            await writer.drain()
+            assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == 'error'
+        writer.write(b'{"op": "hello", "name": "Ala"}\n')
+        await writer.drain()
+        assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == 'welcome'
+        writer.write(b'{"op": {"x": 1}}\n')
+        await writer.drain()
+        assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == 'error'
+        writer.write(b'[{"op": "create"}]\n')
+        await writer.drain()
+        assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == 'error'
+        writer.close()
+        await writer.wait_closed()
+    run(test)
+
+
+def test_tokens_and_seats_are_dropped():
+    async def test(server):
+        idle, = await clients(server, "Ola")
+        await idle.close()
+        a, b, game = await two_player_game(server)
+        await a.close()
+        await asyncio.sleep(0.05)
+        # The seat in the running game is kept for a reconnect, then freed
+        assert idle.sid not in server.tokens
+        assert server.seats[a.sid] == game.lobby_id and a.sid in server.tokens
+        await asyncio.sleep(0.3)
+        assert a.sid not in server.seats and a.sid not in server.tokens
+        assert not game.get_player_by_sid(a.sid)
+        await b.close()
+        await asyncio.sleep(0.3)
+        assert not server.tokens and not server.seats and not server.expiry_tasks
+    run(test, reconnect_grace=0.2)
@@ -0,0 +1,33 @@
+import pytest
+from tournament import round_robin, swiss_round
+
+
+def seated(schedule):
+    return {name for _, seating in schedule for name in seating}
+
+
+def test_swiss_byes_rotate():
+    bots = ["a", "b", "c", "d", "e"]
+    ratings = {name: i for i, name in enumerate(bots)}
+    byes = {}
+    sat_out = []
+    for round_no in range(5):
+        schedule = swiss_round(bots, ratings, 2, round_no, 1, byes)
+        rest = set(bots) - seated(schedule)
+        assert len(rest) == 1 and len(schedule) == 2
+        sat_out += rest
+    # Weakest first, and nobody twice before everybody once
+    assert sat_out == bots
+    assert byes == dict.fromkeys(bots, 1)
+
+
+def test_swiss_tables_group_by_rating():
+    bots = ["a", "b", "c", "d"]
+    schedule = swiss_round(bots, {"a": 3, "b": 1, "c": 2, "d": 0}, 2, 0, 2)
+    assert [seating for _, seating in schedule] == [("a", "c"), ("c", "a"), ("b", "d"), ("d", "b")]
+
+
+def test_oversized_tables_are_rejected():
+    for schedule in (lambda: round_robin(["a", "b"], [3], 1), lambda: swiss_round(["a", "b"], {}, 3, 0, 1)):
+        with pytest.raises(ValueError):
+            schedule()
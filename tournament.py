@@ -0,0 +1,274 @@
+import itertools
+import json
+import math
+import os
+import random
+from multiprocessing import Pool
+from bots import BOTS
+from game_logic import Game, Player
+
+# Plays bots against each other with the real rules from game_logic.
+# Every game gets its own RNG derived from (seed, game_id), so results do not
+# depend on which worker runs a game or in what order; a rerun with the same
+# seed writes the same results file byte for byte.
+
+MAX_TURNS_PER_ROUND = 100 # Safety net, a real round never gets close
+STORE_FLUSH_GAMES = 256 # With an analytics store, results are written in batches of this many games
+
+
+def game_rng(seed, game_id, stream):
+    return random.Random(f"{seed}:{game_id}:{stream}")
+
+
+def play_game(job):
+    """Play one game of `rounds` rounds. Runs in a worker process."""
+    game_id, bot_names, seed, rounds, record = job
+    game = Game(game_id, rng=game_rng(seed, game_id, "deck"))
+    recorder = None
+    if record:
+        from analytics import Recorder
+        recorder = Recorder(game)
+    bots = []
+    for seat, name in enumerate(bot_names):
+        sid = f"s{seat}"
+        game.add_player(Player(f"{name}#{seat}", sid))
+        bots.append(BOTS[name](game, sid, game_rng(seed, game_id, seat)))
+    by_sid = {bot.sid: bot for bot in bots}
+
+    game.start_game()
+    round_winners = []
+    for round_no in range(rounds):
+        if round_no:
+            game.start_round()
+        scores_before = [p.score for p in game.players]
+        for _ in range(MAX_TURNS_PER_ROUND):
+            if game.game_over:
+                break
+            current = game.players[game.turn_index]
+            card_index, target_sid, guess = by_sid[current.sid].choose_move()
+            success, msg = game.play_card(current.sid, card_index, target_sid, guess)
+            if not success:
+                raise RuntimeError(f"{game_id}: bot {current.name} made an illegal move: {msg}")
+        round_winners.append([i for i, p in enumerate(game.players) if p.score > scores_before[i]])
+
+    result = {
+        'id': game_id,
+        'bots': list(bot_names),
+        'points': [p.score for p in game.players],
+        'round_winners': round_winners,
+    }
+    if recorder:
+        result['rows'] = recorder.take() # Stored by the parent, not written to the results file
+    return result
+
+
+# --- Scheduling ---
+
+def round_robin(bot_names, seat_counts, games_per_table):
+    """Every combination of bots for every table size, each seating rotation played equally."""
+    schedule = []
+    for seats in seat_counts:
+        if seats > len(bot_names):
+            raise ValueError(f"Need at least {seats} bots for a {seats} seat table.")
+        for table in itertools.combinations(sorted(bot_names), seats):
+            for n in range(games_per_table):
+                shift = n % seats
+                seating = table[shift:] + table[:shift]
+                schedule.append((f"rr{seats}-{'-'.join(table)}-{n}", seating))
+    return schedule
+
+
+def swiss_round(bot_names, ratings, seats, round_no, games_per_table, byes=None):
+    """Group bots of similar rating at the same table, strongest first.
+
+    Bots left over from the last full table sit the round out. `byes` counts
+    past byes per bot and is updated: the bots with the fewest byes sit out,
+    weakest first, so no bot sits out twice before every bot has sat out once.
+    """
+    if seats > len(bot_names):
+        raise ValueError(f"Need at least {seats} bots for a {seats} seat table.")
+    byes = {} if byes is None else byes
+    sitting_out = sorted(bot_names, key=lambda name: (byes.get(name, 0), ratings.get(name, 0.0), name))
+    sitting_out = sitting_out[:len(bot_names) % seats]
+    for name in sitting_out:
+        byes[name] = byes.get(name, 0) + 1
+    order = sorted(set(bot_names) - set(sitting_out), key=lambda name: (-ratings.get(name, 0.0), name))
+    schedule = []
+    for t in range(0, len(order) - seats + 1, seats):
+        table = tuple(order[t:t + seats])
+        for n in range(games_per_table):
+            shift = n % seats
+            schedule.append((f"sw{seats}-r{round_no}-t{t // seats}-{n}", table[shift:] + table[:shift]))
+    return schedule
+
+
+# --- Results file ---
+
+def load_results(path):
+    """Results already on disk; a line cut off by an interruption is dropped."""
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, "rb+") as f:
+        good_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break # Even if it parses, the next append would run into it
+            try:
+                result = json.loads(line)
+            except ValueError:
+                break
+            results[result['id']] = result
+            good_end += len(line)
+        f.truncate(good_end)
+    return results
+
+
+def run_schedule(schedule, seed, rounds, out_path, workers=None, results=None, store=None):
+    """Play every game of the schedule not already in `results`, appending each to out_path.
+
+    With an analytics ColumnStore, the rounds of the newly played games are added to it too.
+    Rows and result lines are committed in batches: first the store commits the rows and
+    the batch's game ids at once, then the lines are written. A game in the results file
+    always has its rows in the store; a game of the last store batch whose line is missing
+    is replayed for its line only, so its rows are never added twice.
+    """
+    results = results if results is not None else load_results(out_path)
+    record = store is not None
+    committed = set(store.games) if record else set() # Rows in the store, line possibly lost
+    jobs = [(game_id, seating, seed, rounds, record) for game_id, seating in schedule if game_id not in results]
+    if jobs:
+        with open(out_path, "a", encoding="utf-8") as out, Pool(workers) as pool:
+            pending = [] # Played, but their rows are not committed to the store yet
+
+            def commit():
+                if not pending:
+                    return
+                if record:
+                    store.commit([result['id'] for result in pending])
+                for result in pending:
+                    out.write(json.dumps(result, sort_keys=True) + "\n")
+                out.flush()
+                pending.clear()
+
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 8))
+            try:
+                # imap keeps schedule order, so the file is identical however the pool is sized
+                for result in pool.imap(play_game, jobs, chunksize):
+                    if record:
+                        rows = result.pop('rows')
+                        if result['id'] not in committed:
+                            store.extend(*rows)
+                    results[result['id']] = result
+                    pending.append(result)
+                    if not record or len(pending) >= STORE_FLUSH_GAMES:
+                        commit()
+            finally:
+                commit() # Also on interruption: whatever was played is kept in both
+    return [results[game_id] for game_id, _ in schedule]
+
+
+# --- Ratings ---
+
+def pairwise_outcomes(results):
+    """Split every multi-seat game into head-to-head results: (a, b, score_of_a)."""
+    outcomes = []
+    for result in results:
+        seats = list(zip(result['bots'], result['points']))
+        for (a, pa), (b, pb) in itertools.combinations(seats, 2):
+            if a != b:
+                outcomes.append((a, b, 1.0 if pa > pb else 0.0 if pa < pb else 0.5))
+    return outcomes
+
+
+def elo_ratings(outcomes, names, iterations=200):
+    """Bradley-Terry maximum likelihood fit on the Elo scale, mean rating 0."""
+    wins = {n: 0.0 for n in names}
+    games = {}
+    for a, b, s in outcomes:
+        wins[a] += s
+        wins[b] += 1.0 - s
+        key = (a, b) if a < b else (b, a)
+        games[key] = games.get(key, 0) + 1
+
+    strength = {n: 1.0 for n in names}
+    for _ in range(iterations):
+        new = {}
+        for n in names:
+            # One virtual drawn game against a rating-0 opponent keeps unbeaten bots finite
+            denom = 1.0 / (strength[n] + 1.0)
+            for (a, b), count in games.items():
+                if n == a or n == b:
+                    denom += count / (strength[a] + strength[b])
+            new[n] = (wins[n] + 0.5) / denom
+        mean_log = sum(math.log(v) for v in new.values()) / len(new)
+        strength = {n: v / math.exp(mean_log) for n, v in new.items()}
+
+    return {n: 400.0 * math.log10(strength[n]) for n in names}
+
+
+def elo_with_intervals(results, names, seed, samples=200, level=0.95):
+    """Ratings plus a bootstrap confidence interval (resampling whole games)."""
+    ratings = elo_ratings(pairwise_outcomes(results), names)
+    rng = random.Random(f"{seed}:bootstrap")
+    boot = {n: [] for n in names}
+    for _ in range(samples):
+        sample = [results[rng.randrange(len(results))] for _ in results]
+        for n, r in elo_ratings(pairwise_outcomes(sample), names, iterations=50).items():
+            boot[n].append(r)
+    lo_index = int((1 - level) / 2 * samples)
+    hi_index = samples - 1 - lo_index
+    table = {}
+    for n in names:
+        values = sorted(boot[n])
+        table[n] = (ratings[n], values[lo_index], values[hi_index])
+    return table
+
+
+def run_tournament(bot_names, seat_counts=(2,), games_per_table=10, rounds=5, seed=0,
+                   out_path="tournament.jsonl", workers=None, swiss_rounds=0, store=None):
+    bot_names = sorted(set(bot_names))
+    results = load_results(out_path)
+    if swiss_rounds:
+        all_results = []
+        ratings = {}
+        byes = {seats: {} for seats in seat_counts}
+        for round_no in range(swiss_rounds):
+            for seats in seat_counts:
+                schedule = swiss_round(bot_names, ratings, seats, round_no, games_per_table, byes[seats])
+                all_results += run_schedule(schedule, seed, rounds, out_path, workers, results, store)
+            ratings = elo_ratings(pairwise_outcomes(all_results), bot_names)
+    else:
+        schedule = round_robin(bot_names, seat_counts, games_per_table)
+        all_results = run_schedule(schedule, seed, rounds, out_path, workers, results, store)
+    return all_results, elo_with_intervals(all_results, bot_names, seed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Turniej botów List Miłosny z rankingiem Elo.")
+    parser.add_argument("--bots", nargs="+", default=sorted(BOTS), choices=sorted(BOTS))
+    parser.add_argument("--seats", nargs="+", type=int, default=[2], choices=[2, 3, 4])
+    parser.add_argument("--games", type=int, default=10, help="Games per table (per Swiss round).")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per game.")
+    parser.add_argument("--swiss", type=int, default=0, help="Swiss rounds instead of round-robin.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="tournament.jsonl")
+    parser.add_argument("--analytics", default=None, help="Also record rounds into this analytics store.")
+    args = parser.parse_args()
+
+    store = None
+    if args.analytics:
+        from analytics import ColumnStore
+        store = ColumnStore(args.analytics)
+    try:
+        results, table = run_tournament(args.bots, args.seats, args.games, args.rounds, args.seed,
+                                        args.out, args.workers, args.swiss, store)
+    finally:
+        if store:
+            store.close()
+    print(f"{len(results)} gier")
+    for name, (rating, lo, hi) in sorted(table.items(), key=lambda kv: -kv[1][0]):
+        print(f"{name:12} {rating:+7.1f}  [{lo:+7.1f}, {hi:+7.1f}]")
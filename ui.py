@@ -0,0 +1,375 @@
+import html
+import os
+import time
+import uuid
+import streamlit as st
+from cards import Card
+from ui_assets import ACTION_TEMPLATE, CARD_HTML, OPPONENT_TEMPLATE, card_html
+
+# Screens of the Streamlit app. Streamlit re-executes streamlit_app.py on every
+# interaction; keeping the screens in a module means they are defined once per
+# process and each rerun only calls main(). game_logic is imported by the first
+# screen that needs the manager, not by the login screen's first paint.
+
+# Global Game Manager (Cached)
+@st.cache_resource
+def get_manager():
+    from game_logic import GameManager
+    store = None
+    if os.environ.get("ANALYTICS_DIR"):
+        # Rounds of every lobby go to this store, committed once a minute. One writer
+        # per directory: give the server and each app process their own.
+        from analytics import LIVE_COMMIT_SECONDS, ColumnStore
+        store = ColumnStore(os.environ["ANALYTICS_DIR"], commit_every=LIVE_COMMIT_SECONDS)
+    return GameManager(store=store)
+
+@st.cache_resource
+def get_matchmaker():
+    from matchmaking import Matchmaker
+    return Matchmaker(get_manager())
+
+# --- Functions ---
+
+def init_session():
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())[:8]
+
+    if 'nickname' not in st.session_state:
+        st.session_state.nickname = ""
+
+    if 'lobby_id' not in st.session_state:
+        st.session_state.lobby_id = None
+
+    if 'quick_play' not in st.session_state:
+        st.session_state.quick_play = False # Seated by the matchmaker, not with a code
+
+def leave_quick_play():
+    # Only quick-play sessions touch the matchmaker, code lobbies never import it
+    if st.session_state.quick_play:
+        get_matchmaker().forget(st.session_state.session_id)
+        st.session_state.quick_play = False
+
+def leave_game():
+    game = get_manager().get_game(st.session_state.lobby_id)
+    if game:
+        game.remove_player(st.session_state.session_id)
+    leave_quick_play()
+    drop_tracker()
+    st.session_state.lobby_id = None
+    st.rerun()
+
+def play_card_action(card_index, target_sid, guess_val):
+    game = get_manager().get_game(st.session_state.lobby_id)
+    if not game: return
+    
+    success, msg = game.play_card(st.session_state.session_id, card_index, target_sid, guess_val)
+    if success:
+        st.success(msg)
+        time.sleep(1) # Show success briefly
+        st.rerun()
+    else:
+        st.error(msg)
+
+# --- Screens ---
+
+def login_screen():
+    st.title("💌 List Miłosny")
+    
+    c1, c2, c3 = st.columns([1,2,1])
+    with c2:
+        st.markdown("### Witaj w grze!")
+        nick = st.text_input("Twój Nick", value=st.session_state.nickname)
+        
+        col_a, col_b = st.columns(2)
+        with col_a:
+            if st.button("Stwórz Nowe Lobby", use_container_width=True):
+                if not nick:
+                    st.error("Podaj nick!")
+                else:
+                    st.session_state.nickname = nick
+                    from game_logic import Player
+                    manager = get_manager()
+                    lobby_id = manager.create_lobby()
+                    game = manager.get_game(lobby_id)
+                    game.add_player(Player(nick, st.session_state.session_id))
+                    st.session_state.lobby_id = lobby_id
+                    st.rerun()
+        
+        with col_b:
+            join_code = st.text_input("Kod Lobby (jeśli dołączasz)")
+            if st.button("Dołącz", use_container_width=True):
+                if not nick or not join_code:
+                    st.error("Podaj nick i kod!")
+                else:
+                    from game_logic import Player
+                    game = get_manager().get_game(join_code.upper())
+                    if not game:
+                        st.error("Nie ma takiego lobby.")
+                    elif game.game_started and not game.game_over: 
+                         # Check if rejoining? Simplified: Block.
+                         st.error("Gra już trwa.")
+                    else:
+                        st.session_state.nickname = nick
+                        if game.add_player(Player(nick, st.session_state.session_id)):
+                            st.session_state.lobby_id = join_code.upper()
+                            st.rerun()
+                        else:
+                            st.error("Lobby pełne lub błąd.")
+
+        st.markdown("---")
+        if st.button("⚡ Szybka Gra", use_container_width=True):
+            if not nick:
+                st.error("Podaj nick!")
+            else:
+                st.session_state.nickname = nick
+                matchmaker = get_matchmaker()
+                matchmaker.enqueue(st.session_state.session_id, nick)
+                matchmaker.match()
+                lobby_id = matchmaker.lobby_of(st.session_state.session_id)
+                if lobby_id:
+                    st.session_state.lobby_id = lobby_id
+                    st.session_state.quick_play = True
+                    st.rerun()
+                else:
+                    st.error("Nie udało się znaleźć stołu.")
+
+def lobby_screen(game):
+    st.title(f"Lobby: {game.lobby_id}")
+    st.markdown("---")
+    
+    st.write("### Gracze w lobby:")
+    cols = st.columns(4)
+    for i, p in enumerate(game.players):
+        with cols[i]:
+            role = "👑 Gospodarz" if p.is_host else "Gracz"
+            me_tag = "(Ty)" if p.sid == st.session_state.session_id else ""
+            st.info(f"{p.name} {me_tag}\n\n{role}")
+
+    my_player = game.get_player_by_sid(st.session_state.session_id)
+    if not my_player:
+        st.error("Zostałeś wyrzucony.")
+        time.sleep(2)
+        leave_quick_play()
+        st.session_state.lobby_id = None
+        st.rerun()
+
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Odśwież"):
+            st.rerun()
+        if st.button("Opuść Lobby"):
+            leave_game()
+
+    with col2:
+        if my_player.is_host:
+            if st.button("Rozpocznij Grę", type="primary"):
+                if len(game.players) < 2:
+                    st.error("Potrzeba min. 2 graczy.")
+                else:
+                    game.start_game()
+                    st.rerun()
+        else:
+            st.warning("Oczekiwanie na gospodarza...")
+
+    # Quick-play tables start on their own once full or after the wait deadline
+    if st.session_state.quick_play:
+        get_matchmaker().tick()
+    time.sleep(2)
+    st.rerun()
+
+def render_card_interactive(card, index, my_player, game):
+    st.markdown(card_html(card), unsafe_allow_html=True)
+    
+    # Interaction
+    is_my_turn = (game.players[game.turn_index].sid == my_player.sid)
+    if is_my_turn and not game.game_over:
+        # Spacing
+        st.write("")
+        with st.popover(f"Zagraj {card.name}"):
+            # Target selection logic
+            needs_target = card.value in [1, 2, 3, 5, 6]
+            can_target_self = (card.value == 5)
+            
+            target_sid = None
+            guess_val = None
+            
+            if needs_target:
+                targets = [p for p in game.players if not p.is_out and (p.sid != my_player.sid or can_target_self)]
+                # Filter protected
+                valid_targets = [p for p in targets if not (p.is_protected and p.sid != my_player.sid)]
+                
+                if not valid_targets and not can_target_self:
+                    st.warning("Brak celów - karta bez efektu.")
+                else:
+                    target_options = {p.sid: p.name for p in valid_targets}
+                    if not target_options and can_target_self:
+                             target_options = {my_player.sid: my_player.name}
+                    
+                    if target_options:
+                        selected_sid = st.selectbox("Wybierz cel:", options=list(target_options.keys()), format_func=lambda x: target_options[x], key=f"t_{index}")
+                        target_sid = selected_sid
+            
+            if card.value == 1 and target_sid:
+                guess_val = st.selectbox("Zgadnij kartę:", [2,3,4,5,6,7,8], format_func=lambda x: f"{Card.get_name(x)} ({x})", key=f"g_{index}")
+
+            if st.button("Potwierdź", key=f"btn_{index}", type="primary"):
+                play_card_action(index, target_sid, guess_val)
+
+def drop_tracker():
+    tracker = st.session_state.get('tracker')
+    if tracker:
+        tracker.detach()
+        st.session_state.tracker = None
+
+def get_tracker(game):
+    # One tracker per session, kept attached to the game between reruns.
+    # It only holds a weak reference in game.listeners, so a session that
+    # goes away without dropping it does not keep it alive.
+    tracker = st.session_state.get('tracker')
+    if tracker is None or tracker.game is not game:
+        drop_tracker()
+        from belief import BeliefTracker # Only sessions that open the hints pay for it
+        tracker = BeliefTracker(game, st.session_state.session_id)
+        st.session_state.tracker = tracker
+    return tracker
+
+def render_hints(game, my_player):
+    hints = []
+    with game.lock: # Other sessions play cards while we read
+        tracker = get_tracker(game)
+        values = [c.value for c in my_player.hand]
+        if 1 in values:
+            best = tracker.best_guard_guess()
+            if best:
+                target = game.get_player_by_sid(best[0])
+                hints.append(f"Strażniczka: zgadnij {Card.get_name(best[1])} u {html.escape(target.name)} ({best[2]:.0%})")
+        if 3 in values and len(values) == 2:
+            kept = values[1] if values[0] == 3 else values[0]
+            for p in tracker.targets():
+                win, tie, lose = tracker.baron_odds(p.sid, kept)
+                hints.append(f"Baron na {html.escape(p.name)}: wygrana {win:.0%}, remis {tie:.0%}, przegrana {lose:.0%}")
+    st.caption("<br>".join(hints) if hints else "Brak podpowiedzi dla tej ręki.", unsafe_allow_html=True)
+
+def game_screen(game):
+    game.try_auto_restart()
+    my_player = game.get_player_by_sid(st.session_state.session_id)
+    if not my_player:
+        st.error("Nie ma Cię w grze.")
+        if st.button("Wróć"):
+            leave_quick_play()
+            drop_tracker()
+            st.session_state.lobby_id = None
+            st.rerun()
+        return
+
+    # Top Bar
+    c1, c2, c3 = st.columns([2, 2, 1])
+    c1.subheader(f"🏠 Lobby: {game.lobby_id}")
+    c2.subheader(f"📚 Talia: {len(game.deck)}")
+    if c3.button("🚪 Opuść"):
+        leave_game()
+
+    # Main Layout: 3 Columns (Left: Opponents, Center: Table, Right: Logs)
+    col_opp, col_table, col_logs = st.columns([1, 2, 1])
+
+    turn_player = game.players[game.turn_index]
+
+    with col_opp:
+        st.write("### 👥 Przeciwnicy")
+        for p in game.players:
+            if p.sid == my_player.sid: continue
+            
+            style_class = "opponent-box"
+            status_text = "🟢 W grze"
+            
+            if p.sid == turn_player.sid: 
+                style_class += " active-turn"
+                status_text = "⚠️ JEGO TURA"
+            
+            if p.is_out: 
+                style_class += " eliminated"
+                status_text = "💀 Odpadł"
+            elif p.is_protected: 
+                style_class += " protected"
+                status_text += " | 🛡️ Chroniony"
+            
+            st.markdown(OPPONENT_TEMPLATE.format(style_class=style_class, name=html.escape(p.name),
+                                                 score=p.score, status=status_text), unsafe_allow_html=True)
+
+    with col_table:
+        st.markdown("### 🎲 Stół (Ostatnia akcja)")
+        st.markdown('<div class="table-area">', unsafe_allow_html=True)
+        
+        if game.last_action:
+            action = game.last_action
+            # Show the card played visually
+            st.markdown(CARD_HTML[action['card_value']], unsafe_allow_html=True)
+            st.markdown(ACTION_TEMPLATE.format(player=html.escape(action['player_name']), card=action['card_name'],
+                                               description=html.escape(action['description'])), unsafe_allow_html=True)
+        else:
+            st.markdown("<div style='color: #777;'>Oczekiwanie na ruch...</div>", unsafe_allow_html=True)
+            
+        st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Turn Indicator
+        if turn_player.sid == my_player.sid:
+            st.success("🔔 TWOJA KOLEJ!")
+        else:
+            st.info(f"Czekaj... Tura gracza: {turn_player.name}")
+
+    with col_logs:
+        st.write("### 📜 Logi")
+        log_content = "".join([f"<div class='log-entry'>{l}</div>" for l in reversed(list(game.logs)[-20:])])
+        st.markdown(f"<div class='log-box'>{log_content}</div>", unsafe_allow_html=True)
+
+    st.divider()
+
+    # Player Area (Bottom)
+    st.write(f"### 🃏 Twoja Ręka (Punkty: {my_player.score})")
+    
+    if my_player.is_out:
+        st.error("❌ Odpadłeś z tej rundy. Czekaj na następną.")
+    else:
+        if my_player.is_protected:
+            st.info("🛡️ Jesteś chroniony przed efektami kart do następnej tury.")
+        
+        if my_player.private_message:
+            st.warning(f"👁️ {my_player.private_message}")
+
+        if st.checkbox("💡 Podpowiedzi", key="hints"):
+            render_hints(game, my_player)
+        else:
+            drop_tracker()
+        
+        # Cards Layout
+        cols = st.columns(len(my_player.hand))
+        for i, card in enumerate(my_player.hand):
+            with cols[i]:
+                render_card_interactive(card, i, my_player, game)
+
+    if game.game_over:
+        st.balloons()
+        st.success("🏆 Koniec rundy! Nowa gra rozpocznie się automatycznie...")
+
+    time.sleep(2)
+    st.rerun()
+
+# --- Main App Logic ---
+
+def main():
+    init_session()
+    if not st.session_state.lobby_id:
+        login_screen()
+    else:
+        game = get_manager().get_game(st.session_state.lobby_id)
+        if not game:
+            st.error("Lobby wygasło.")
+            leave_quick_play()
+            drop_tracker()
+            st.session_state.lobby_id = None
+            if st.button("Ok"): st.rerun()
+        elif not game.game_started:
+            lobby_screen(game)
+        else:
+            game_screen(game)
@@ -0,0 +1,172 @@
+from cards import CARD_DESCRIPTIONS, CARD_NAMES
+
+# Static markup for the Streamlit UI. Built once when the module is first
+# imported, so reruns of the script only look these strings up.
+
+CSS = """
+<style>
+    /* Dark Theme Background */
+    .stApp {
+        background-color: #1e1e1e;
+        color: #e0e0e0;
+    }
+    
+    /* Card Container */
+    .card-container {
+        background: linear-gradient(135deg, #ffffff 0%, #f0f0f0 100%);
+        padding: 10px;
+        border-radius: 12px;
+        border: 4px solid #fff;
+        box-shadow: 0 4px 8px rgba(0,0,0,0.3);
+        text-align: center;
+        height: 280px;
+        display: flex;
+        flex-direction: column;
+        justify-content: space-between;
+        color: #333;
+        transition: transform 0.2s;
+    }
+    .card-container:hover {
+        transform: translateY(-5px);
+    }
+    .card-value {
+        font-size: 1.5em;
+        font-weight: bold;
+        align-self: flex-start;
+        border: 2px solid #333;
+        border-radius: 50%;
+        width: 40px;
+        height: 40px;
+        line-height: 35px;
+        display: inline-block;
+    }
+    .card-title {
+        font-weight: bold;
+        font-size: 1.1em;
+        margin: 5px 0;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+    }
+    .card-icon {
+        font-size: 3.5em;
+    }
+    .card-desc {
+        font-size: 0.85em;
+        line-height: 1.2;
+        background: rgba(255,255,255,0.8);
+        padding: 5px;
+        border-radius: 5px;
+    }
+
+    /* Opponent Box */
+    .opponent-box {
+        background-color: #2d2d2d;
+        color: #ecf0f1;
+        padding: 15px;
+        border-radius: 8px;
+        margin: 5px;
+        border: 1px solid #444;
+        text-align: center;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.2);
+    }
+    .active-turn {
+        border: 2px solid #f1c40f;
+        box-shadow: 0 0 15px rgba(241, 196, 15, 0.4);
+    }
+    .protected {
+        border: 2px solid #3498db;
+    }
+    .eliminated {
+        opacity: 0.5;
+        text-decoration: line-through;
+    }
+
+    /* Table / Action Area */
+    .table-area {
+        background-color: #252525;
+        border-radius: 15px;
+        padding: 20px;
+        margin: 20px 0;
+        border: 2px dashed #444;
+        text-align: center;
+        min-height: 200px;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+    }
+    .action-text {
+        font-size: 1.2em;
+        color: #f1c40f;
+        margin-top: 10px;
+    }
+
+    /* Logs */
+    .log-box {
+        height: 400px;
+        overflow-y: auto;
+        background-color: #111;
+        border: 1px solid #333;
+        padding: 10px;
+        font-family: 'Consolas', monospace;
+        font-size: 0.85em;
+        color: #bbb;
+        border-radius: 5px;
+    }
+    .log-entry {
+        border-bottom: 1px solid #222;
+        padding: 4px 0;
+    }
+
+    /* Buttons */
+    .stButton > button {
+        background-color: #e74c3c;
+        color: white;
+        border: none;
+        border-radius: 5px;
+    }
+    .stButton > button:hover {
+        background-color: #c0392b;
+    }
+</style>
+"""
+
+CARD_COLORS = {
+    1: "#3498db", 2: "#2ecc71", 3: "#795548", 4: "#f1c40f",
+    5: "#e67e22", 6: "#f39c12", 7: "#e74c3c", 8: "#9b59b6"
+}
+DEFAULT_COLOR = "#95a5a6"
+
+CARD_TEMPLATE = """
+    <div class="card-container" style="border-color: {color};">
+        <div class="card-value" style="border-color: {color}; color: {color};">{value}</div>
+        <div class="card-title" style="color: {color};">{name}</div>
+        <div class="card-icon">🃏</div>
+        <div class="card-desc">{description}</div>
+    </div>
+    """
+
+OPPONENT_TEMPLATE = """
+            <div class="{style_class}">
+                <div style="font-size: 1.2em; font-weight: bold;">{name}</div>
+                <div>Punkty: {score}</div>
+                <div style="font-size: 0.9em; margin-top: 5px;">{status}</div>
+            </div>
+            """
+
+ACTION_TEMPLATE = """
+            <div class="action-text">
+                <b>{player}</b> zagrał kartę <b>{card}</b><br>
+                <i style="color: #ccc; font-size: 0.8em;">{description}</i>
+            </div>
+            """
+
+CARD_HTML = {
+    value: CARD_TEMPLATE.format(color=CARD_COLORS.get(value, DEFAULT_COLOR), value=value,
+                                name=CARD_NAMES[value], description=CARD_DESCRIPTIONS[value])
+    for value in CARD_NAMES
+}
+
+
+def card_html(card):
+    return CARD_HTML[card.value]